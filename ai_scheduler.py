@@ -0,0 +1,94 @@
+# Level-of-detail scheduling for enemy AI.
+# Working out what an enemy should do (can it see the player, should it
+# retreat, where is cover) costs far more than carrying the plan out, and it
+# doesn't have to happen every frame. Enemies near the player rethink every
+# frame, enemies further away less often, and the rethinking is shared out
+# over frames so that a big wave never has to decide everything at once.
+import time
+
+# Milliseconds between decisions, by distance to the player in pixels
+REFRESH_LEVELS = (
+    (250, 0),    # Close enough to fight - decide every frame
+    (450, 100),  # Mid range - ten times a second
+)
+FAR_REFRESH_INTERVAL = 250  # Everyone further away - four times a second
+
+# How long decisions may take each frame before the rest wait for the next one
+DEFAULT_TIME_BUDGET_MS = 2.0
+
+# Enemies handed to decide() at once when there is a budget, so the time can
+# be checked between batches
+DECISION_BATCH_SIZE = 16
+
+class AIScheduler:
+    """Picks which enemies get to rethink their plan this frame"""
+
+    def __init__(self, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+        self.time_budget_ms = time_budget_ms  # None means no limit
+        self.cursor = 0  # Enemy index the next frame starts from (round robin)
+
+    def reset(self):
+        """Start over for a new match"""
+        self.cursor = 0
+
+    def refresh_interval(self, enemy, distance):
+        """Milliseconds an enemy may keep its plan at this distance from the player"""
+        # Bosses are the main threat and always stay sharp
+        if enemy.is_boss:
+            return 0
+        for max_distance, interval in REFRESH_LEVELS:
+            if distance <= max_distance:
+                return interval
+        return FAR_REFRESH_INTERVAL
+
+    def is_due(self, enemy, distance, current_time):
+        """Check if an enemy's plan is missing or too old"""
+        if enemy.ai_threat_assessment is None:
+            return True
+        age = current_time - enemy.last_ai_threat_check
+        return age >= self.refresh_interval(enemy, distance)
+
+    def run(self, enemies, distances, current_time, decide):
+        """
+        Call decide(indices) with the enemies that are due a new plan.
+
+        Enemies are visited round robin, starting where the last frame stopped.
+        Without a budget every due enemy is passed in one call; with one they
+        are passed in batches. Once the time budget is spent only enemies that
+        must decide every frame (or have no plan yet) still go; the others keep
+        their old plan for now.
+        """
+        count = len(enemies)
+        if count == 0:
+            return
+
+        budget = self.time_budget_ms
+        start = time.perf_counter()
+        first = self.cursor % count
+        deferred = None
+        batch_size = count if budget is None else DECISION_BATCH_SIZE
+        batch = []
+
+        for offset in range(count):
+            index = (first + offset) % count
+            enemy = enemies[index]
+            if not self.is_due(enemy, distances[index], current_time):
+                continue
+
+            if (budget is not None and
+                    (time.perf_counter() - start) * 1000 > budget and
+                    enemy.ai_threat_assessment is not None and
+                    self.refresh_interval(enemy, distances[index]) > 0):
+                # Out of time - remember where to pick up next frame
+                if deferred is None:
+                    deferred = index
+                continue
+
+            batch.append(index)
+            if len(batch) == batch_size:
+                decide(batch)
+                batch = []
+
+        if batch:
+            decide(batch)
+        self.cursor = deferred if deferred is not None else first + 1
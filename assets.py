@@ -0,0 +1,101 @@
+# Registry for the full-screen menu images.
+# The title, lose and win backgrounds are decoded from disk once, converted to
+# the display's pixel format and scaled to the game area once per display
+# mode. The darkening overlays drawn on top of them are kept as well.
+# Decoding the PNGs can start on a background thread while the game starts up.
+import os
+import threading
+import pygame
+from surfaces import finalize_surface
+
+ASSET_DIR = "assets"
+
+# Background name -> file name inside ASSET_DIR
+BACKGROUND_FILES = {
+    "title": "title.png",
+    "lose": "lose.png",
+    "win": "win.png",
+}
+
+class AssetRegistry:
+    """Loads menu backgrounds once and keeps them ready for drawing"""
+
+    def __init__(self, asset_dir=ASSET_DIR):
+        self.asset_dir = asset_dir
+        self.decoded = {}  # Name -> image as loaded from disk (None if missing or broken)
+        self.converted = {}  # Name -> image in the display's pixel format
+        self.scaled = {}  # (name, width, height) -> image scaled to the game area
+        self.overlays = {}  # (width, height, alpha) -> see-through black surface
+        self.preload_thread = None
+
+    def start_preload(self):
+        """Decode every background on a background thread"""
+        # Only decoding happens there - converting needs the display, which
+        # belongs to the main thread, so that waits until first use
+        self.preload_thread = threading.Thread(target=self.decode_all, daemon=True)
+        self.preload_thread.start()
+
+    def decode_all(self):
+        """Decode every background that hasn't been decoded yet"""
+        for name in BACKGROUND_FILES:
+            if name not in self.decoded:
+                self.decoded[name] = self.decode(name)
+
+    def decode(self, name):
+        """Read one background from disk, or None if it can't be used"""
+        path = os.path.join(self.asset_dir, BACKGROUND_FILES[name])
+        if not os.path.exists(path):
+            return None
+        try:
+            return pygame.image.load(path)
+        except Exception as e:
+            print(f"Error loading {name} image: {e}")
+            return None
+
+    def get_image(self, name):
+        """A background converted for the display, or None if it can't be used"""
+        if name in self.converted:
+            return self.converted[name]
+
+        # Let a running preload finish rather than decode the same file twice
+        if self.preload_thread is not None:
+            self.preload_thread.join()
+            self.preload_thread = None
+
+        if name not in self.decoded:
+            self.decoded[name] = self.decode(name)
+
+        image = self.decoded[name]
+        if image is not None:
+            image = finalize_surface(image)
+        self.converted[name] = image
+        return image
+
+    def get_background(self, name, width, height):
+        """A background scaled to width x height, or None if it can't be used"""
+        key = (name, width, height)
+        if key not in self.scaled:
+            image = self.get_image(name)
+            if image is not None:
+                image = pygame.transform.scale(image, (width, height))
+            self.scaled[key] = image
+        return self.scaled[key]
+
+    def get_overlay(self, width, height, alpha):
+        """A black surface that darkens what it is drawn over (alpha 0-255)"""
+        key = (width, height, alpha)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            # One alpha value for the whole surface blends the same as a
+            # per-pixel alpha surface filled with (0, 0, 0, alpha), but faster
+            overlay = pygame.Surface((width, height)).convert()
+            overlay.fill((0, 0, 0))
+            overlay.set_alpha(alpha)
+            self.overlays[key] = overlay
+        return overlay
+
+    def reset_display(self):
+        """Forget everything made for the old display mode (the decoded images are kept)"""
+        self.converted.clear()
+        self.scaled.clear()
+        self.overlays.clear()
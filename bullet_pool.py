@@ -0,0 +1,82 @@
+# Bullet storage kept as parallel columns ("struct of arrays").
+# Instead of one dictionary per bullet, every property lives in its own
+# preallocated list and bullet number i is found at index i of each list.
+# Live bullets are always packed at the front, so there are no holes to skip.
+import math
+
+class BulletPool:
+    """Preallocated storage for every bullet in flight"""
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.count = 0  # Bullets 0..count-1 are alive
+
+        # One column per bullet property
+        self.x = []
+        self.y = []
+        self.vx = []  # Movement per update, worked out once when fired
+        self.vy = []
+        self.radius = []
+        self.damage = []
+        self.is_player = []
+        self.color_index = []  # Index into self.palette
+
+        # Bullets share a handful of colors, so each color is stored once
+        self.palette = []
+        self.palette_lookup = {}
+
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """Make room for at least this many bullets"""
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        for column in (self.x, self.y, self.vx, self.vy, self.radius, self.damage, self.color_index):
+            column.extend([0] * extra)
+        self.is_player.extend([False] * extra)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Remove all bullets (the columns keep their size for reuse)"""
+        self.count = 0
+
+    def get_color_index(self, color):
+        """Palette index for a color, adding it the first time it is seen"""
+        index = self.palette_lookup.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_lookup[color] = index
+        return index
+
+    def spawn(self, x, y, direction, speed, radius, damage, is_player, color):
+        """Add a bullet flying at direction (degrees) with speed pixels per update"""
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        angle_rad = math.radians(direction)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = math.cos(angle_rad) * speed
+        self.vy[i] = math.sin(angle_rad) * speed
+        self.radius[i] = radius
+        self.damage[i] = damage
+        self.is_player[i] = is_player
+        self.color_index[i] = self.get_color_index(color)
+        self.count += 1
+
+    def move(self, source, target):
+        """Copy bullet number source into slot target (used when packing)"""
+        self.x[target] = self.x[source]
+        self.y[target] = self.y[source]
+        self.vx[target] = self.vx[source]
+        self.vy[target] = self.vy[source]
+        self.radius[target] = self.radius[source]
+        self.damage[target] = self.damage[source]
+        self.is_player[target] = self.is_player[source]
+        self.color_index[target] = self.color_index[source]
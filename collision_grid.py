@@ -0,0 +1,61 @@
+# Tile occupancy grid for wall collision queries.
+# Walls always sit on the tile grid, so instead of checking every wall we
+# only look at the few tiles a point or rectangle actually covers.
+import math
+
+class WallGrid:
+    """Remembers which map tiles contain a wall"""
+
+    def __init__(self, walls, map_width, map_height, tile_size):
+        self.width = map_width  # Number of tiles horizontally
+        self.height = map_height  # Number of tiles vertically
+        self.tile_size = tile_size
+
+        # One byte per tile, row by row: 1 = wall, 0 = open
+        self.cells = bytearray(map_width * map_height)
+        for wall in walls:
+            self.add_wall(wall)
+
+    def add_wall(self, wall):
+        """Mark every tile covered by a wall dictionary"""
+        first_x, last_x, first_y, last_y = self.tile_range(
+            wall["x"], wall["y"], wall["width"], wall["height"]
+        )
+        for ty in range(first_y, last_y + 1):
+            for tx in range(first_x, last_x + 1):
+                self.cells[ty * self.width + tx] = 1
+
+    def tile_range(self, x, y, width, height):
+        """First and last tile column and row touched by a rectangle, clipped to the map"""
+        tile_size = self.tile_size
+        first_x = max(0, math.floor(x / tile_size))
+        last_x = min(self.width, math.ceil((x + width) / tile_size)) - 1
+        first_y = max(0, math.floor(y / tile_size))
+        last_y = min(self.height, math.ceil((y + height) / tile_size)) - 1
+        return first_x, last_x, first_y, last_y
+
+    def is_wall_tile(self, tile_x, tile_y):
+        """Check if a tile holds a wall (tiles outside the map never do)"""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.cells[tile_y * self.width + tile_x] == 1
+        return False
+
+    def point_in_wall(self, x, y):
+        """Check if a point in pixels lies inside a wall"""
+        return self.is_wall_tile(int(x // self.tile_size), int(y // self.tile_size))
+
+    def rect_overlaps_wall(self, x, y, width, height):
+        """
+        Check if a rectangle overlaps any wall.
+
+        Touching a wall edge is not an overlap, the same as pygame.Rect.colliderect.
+        """
+        first_x, last_x, first_y, last_y = self.tile_range(x, y, width, height)
+
+        cells = self.cells
+        for ty in range(first_y, last_y + 1):
+            row = ty * self.width
+            for tx in range(first_x, last_x + 1):
+                if cells[row + tx]:
+                    return True
+        return False
@@ -0,0 +1,78 @@
+# Controllers drive the player without a keyboard, for headless runs.
+# A controller is any object with a get_actions(game) method that returns
+# the same action dictionary the keyboard produces:
+#     {"up": bool, "down": bool, "left": bool, "right": bool, "shoot": bool}
+import math
+import random
+
+NO_ACTIONS = {"up": False, "down": False, "left": False, "right": False, "shoot": False}
+
+class ScriptedController:
+    """Replays a fixed list of actions, one entry per frame"""
+
+    def __init__(self, script, loop=True):
+        # Each entry may list only the keys that are pressed
+        self.script = [dict(NO_ACTIONS, **step) for step in script]
+        self.loop = loop
+        self.frame = 0
+
+    def get_actions(self, game):
+        """Return the actions for the current frame"""
+        if not self.script:
+            return NO_ACTIONS
+
+        if self.frame >= len(self.script):
+            if not self.loop:
+                return NO_ACTIONS
+            self.frame = 0
+
+        actions = self.script[self.frame]
+        self.frame += 1
+        return actions
+
+class SimpleAIController:
+    """Walks towards the closest enemy and keeps shooting"""
+
+    def __init__(self, seed=None, keep_distance=120):
+        self.random = random.Random(seed)
+        self.keep_distance = keep_distance  # Don't walk closer than this
+        self.last_position = None
+        self.detour = None  # Direction to try when stuck on a wall
+        self.detour_frames = 0
+
+    def get_actions(self, game):
+        """Pick movement and shooting for the current frame"""
+        player = game.player
+        actions = dict(NO_ACTIONS, shoot=True)
+
+        if not game.enemies:
+            return actions
+
+        # If we didn't move last frame we're stuck - wander sideways for a bit
+        position = (player.x, player.y)
+        if self.detour_frames > 0:
+            self.detour_frames -= 1
+            actions[self.detour] = True
+            self.last_position = position
+            return actions
+        if position == self.last_position:
+            self.detour = self.random.choice(["up", "down", "left", "right"])
+            self.detour_frames = self.random.randint(10, 30)
+        self.last_position = position
+
+        # Head for the closest enemy
+        closest = min(
+            game.enemies,
+            key=lambda enemy: (enemy.x - player.x)**2 + (enemy.y - player.y)**2
+        )
+        dx = closest.x - player.x
+        dy = closest.y - player.y
+        if math.sqrt(dx**2 + dy**2) < self.keep_distance:
+            # Close enough - back off instead
+            dx, dy = -dx, -dy
+
+        actions["left"] = dx < -player.speed
+        actions["right"] = dx > player.speed
+        actions["up"] = dy < -player.speed
+        actions["down"] = dy > player.speed
+        return actions
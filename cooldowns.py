@@ -0,0 +1,66 @@
+# Enemy attack cooldowns and regeneration, tracked only where they matter.
+# Most enemies are ready to attack and at full health on most frames, so
+# instead of checking every enemy's timestamps each frame we keep the few
+# that are still cooling down (they attacked or spawned recently) and the few
+# that are hurt. Everyone else is known to be ready without looking, and a
+# frame where nobody has attacked or been hit visits no enemy at all.
+
+# Retreating enemies shoot back this many times slower than they attack
+RETREAT_COOLDOWN_FACTOR = 1.5
+
+class CooldownTracker:
+    """Enemies with a cooldown still running, and enemies that are hurt"""
+
+    def __init__(self):
+        self.cooling = set()  # Attacked or spawned, and not ready for everything yet
+        self.hurt = set()  # Alive with less than full health
+
+    def reset(self):
+        """Forget every enemy (at the start of a match)"""
+        self.cooling.clear()
+        self.hurt.clear()
+
+    def track(self, enemy):
+        """Watch an enemy's cooldowns again - after it spawns or attacks"""
+        self.cooling.add(enemy)
+
+    def was_hit(self, enemy):
+        """Note that an enemy lost health, so it may regenerate"""
+        self.hurt.add(enemy)
+
+    def forget(self, enemy):
+        """Stop tracking an enemy (when it dies)"""
+        self.cooling.discard(enemy)
+        self.hurt.discard(enemy)
+
+    def update(self, current_time):
+        """
+        Check the enemies still cooling down and drop those that are ready.
+
+        Returns three sets of enemies: those that may not attack yet, those that
+        may not shoot back while retreating yet and bosses whose special attack
+        isn't ready. Enemies in none of them are ready for everything.
+        """
+        not_ready = set()
+        not_ready_retreating = set()
+        special_not_ready = set()
+        ready = []
+
+        for enemy in self.cooling:
+            since_attack = current_time - enemy.last_attack_time
+            cooldown = 1000 / enemy.attack_speed
+            if since_attack <= cooldown:
+                not_ready.add(enemy)
+            waiting = since_attack <= cooldown * RETREAT_COOLDOWN_FACTOR
+            if waiting:
+                not_ready_retreating.add(enemy)
+            if (enemy.is_boss and
+                    current_time - enemy.last_special_attack_time <= enemy.special_cooldown):
+                special_not_ready.add(enemy)
+                waiting = True
+            if not waiting:
+                ready.append(enemy)
+
+        for enemy in ready:
+            self.cooling.discard(enemy)
+        return not_ready, not_ready_retreating, special_not_ready
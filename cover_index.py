@@ -0,0 +1,97 @@
+# Cover points for retreating enemies.
+# Good hiding places don't change while a map is played, so they are found
+# once per map: every open tile with a wall next to it, remembering which
+# directions that wall protects it from. The tiles are bucketed into regions
+# so an enemy only looks at the cover close to it.
+import math
+
+# Neighbouring tiles in the order of the eight compass directions, starting
+# east and turning clockwise (screen y points down): E, SE, S, SW, W, NW, N, NE
+DIRECTION_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+class CoverIndex:
+    """Hiding tiles of a map, grouped by region"""
+
+    def __init__(self, wall_grid, vision, region_tiles=4):
+        self.vision = vision  # Its visibility table (if any) gives exact answers
+        self.tile_size = wall_grid.tile_size
+        self.region_size = region_tiles * wall_grid.tile_size  # Region width in pixels
+        self.regions = {}  # (region_x, region_y) -> list of cover points
+
+        for tile_y in range(wall_grid.height):
+            for tile_x in range(wall_grid.width):
+                if wall_grid.is_wall_tile(tile_x, tile_y):
+                    continue
+
+                # One bit per direction that has a wall right next to this tile
+                cover_mask = 0
+                for direction, (dx, dy) in enumerate(DIRECTION_OFFSETS):
+                    if wall_grid.is_wall_tile(tile_x + dx, tile_y + dy):
+                        cover_mask |= 1 << direction
+                if not cover_mask:
+                    continue
+
+                x = (tile_x + 0.5) * self.tile_size
+                y = (tile_y + 0.5) * self.tile_size
+                region = (tile_x // region_tiles, tile_y // region_tiles)
+                self.regions.setdefault(region, []).append(
+                    (x, y, tile_y * wall_grid.width + tile_x, cover_mask)
+                )
+
+    def hides_from(self, cover, player_x, player_y, player_tile):
+        """Check if a cover point is out of the player's sight"""
+        x, y, tile, cover_mask = cover
+        table = self.vision.table
+        if table is not None and player_tile is not None:
+            return not table.tiles_visible(tile, player_tile)
+
+        # Without a table: is there a wall on the side facing the player?
+        direction = round(math.atan2(player_y - y, player_x - x) / (math.pi / 4)) % 8
+        return cover_mask & (1 << direction) != 0
+
+    def find_cover(self, x, y, player_x, player_y, max_distance=300, min_player_distance=200):
+        """
+        Nearest cover point to (x, y) that hides from the player.
+
+        Only points within max_distance of (x, y) and at least
+        min_player_distance from the player count. Returns the pixel center
+        of the cover tile, or None if there is nothing suitable.
+        """
+        region_size = self.region_size
+        regions = self.regions
+        table = self.vision.table
+        player_tile = table.tile_index(player_x, player_y) if table is not None else None
+
+        region_x = int(x // region_size)
+        region_y = int(y // region_size)
+        max_ring = int(max_distance // region_size) + 1
+        max_distance_sq = max_distance * max_distance
+        min_player_distance_sq = min_player_distance * min_player_distance
+
+        best = None
+        best_distance_sq = max_distance_sq
+
+        # Search rings of regions around the starting region, closest first
+        for ring in range(max_ring + 1):
+            for rx in range(region_x - ring, region_x + ring + 1):
+                for ry in range(region_y - ring, region_y + ring + 1):
+                    # Only the outline of the ring - the inside was searched already
+                    if ring and region_x - ring < rx < region_x + ring and region_y - ring < ry < region_y + ring:
+                        continue
+                    for cover in regions.get((rx, ry), ()):
+                        distance_sq = (cover[0] - x) ** 2 + (cover[1] - y) ** 2
+                        if distance_sq >= best_distance_sq:
+                            continue
+                        if (cover[0] - player_x) ** 2 + (cover[1] - player_y) ** 2 < min_player_distance_sq:
+                            continue
+                        if self.hides_from(cover, player_x, player_y, player_tile):
+                            best = cover
+                            best_distance_sq = distance_sq
+
+            # Anything in the next ring is at least this far away
+            if best is not None and best_distance_sq <= (ring * region_size) ** 2:
+                break
+
+        if best is None:
+            return None
+        return (best[0], best[1])
@@ -0,0 +1,113 @@
+# Short-lived effects: kill notifications and floating text.
+# Effects live in a fixed number of slots: a new effect takes a free slot, and
+# only when all slots are taken does the oldest effect make room, so memory
+# never grows. Live effects are also chained oldest to newest through the
+# prev/next columns, so finding the oldest and drawing in order need no search.
+# Each effect sets a timer on the game clock that frees its slot once it has
+# ended, so no frame has to check which effects are over.
+
+# Most effects alive at once
+EFFECT_CAPACITY = 128
+
+# Effect kinds
+KILL_NOTICE = 0  # "Enemy name" in the corner after a kill
+FLOATING_TEXT = 1  # Text above a spot in the arena ("+", "!!")
+
+# End of the chain of live effects
+NO_SLOT = -1
+
+class EffectSystem:
+    """Fixed pool of short-lived effects that free themselves when they end"""
+
+    def __init__(self, clock, capacity=EFFECT_CAPACITY):
+        self.clock = clock  # GameClock whose timers end the effects
+        self.capacity = capacity
+
+        # One entry per slot in each column (like the bullet pool)
+        self.kind = [KILL_NOTICE] * capacity
+        self.text = [""] * capacity
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.color = [(255, 255, 255)] * capacity
+        self.start_time = [0] * capacity
+        self.end_time = [0] * capacity
+        self.alive = [False] * capacity
+        self.timer = [None] * capacity  # Timer that frees the slot
+        self.prev = [NO_SLOT] * capacity  # Next older live effect
+        self.next = [NO_SLOT] * capacity  # Next newer live effect
+
+        self.reset()
+
+    def reset(self):
+        """Remove every effect (at the start of a match)"""
+        for slot in range(self.capacity):
+            if self.alive[slot]:
+                self.timer[slot].cancel()
+            self.alive[slot] = False
+        # Popped from the end, so slot 0 is used first
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
+        self.oldest = NO_SLOT
+        self.newest = NO_SLOT
+        self.live_count = 0
+
+    def spawn(self, kind, text, x, y, color, current_time, lifespan):
+        """Start an effect that lasts lifespan milliseconds and return its slot"""
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            # All slots taken: the oldest effect makes room (and won't be freed later)
+            slot = self.oldest
+            self.timer[slot].cancel()
+            self.unlink(slot)
+
+        self.kind[slot] = kind
+        self.text[slot] = text
+        self.x[slot] = x
+        self.y[slot] = y
+        self.color[slot] = color
+        self.start_time[slot] = current_time
+        self.end_time[slot] = current_time + lifespan
+        self.alive[slot] = True
+        self.live_count += 1
+
+        # Newest at the end of the chain
+        self.prev[slot] = self.newest
+        self.next[slot] = NO_SLOT
+        if self.newest == NO_SLOT:
+            self.oldest = slot
+        else:
+            self.next[self.newest] = slot
+        self.newest = slot
+
+        # Shown up to and including end_time, freed just after
+        self.timer[slot] = self.clock.schedule_at(self.end_time[slot] + 1, self.free, slot)
+        return slot
+
+    def unlink(self, slot):
+        """Take a live effect out of the chain"""
+        prev_slot = self.prev[slot]
+        next_slot = self.next[slot]
+        if prev_slot == NO_SLOT:
+            self.oldest = next_slot
+        else:
+            self.next[prev_slot] = next_slot
+        if next_slot == NO_SLOT:
+            self.newest = prev_slot
+        else:
+            self.prev[next_slot] = prev_slot
+        self.alive[slot] = False
+        self.live_count -= 1
+
+    def free(self, slot):
+        """Free an effect that has ended (run by its timer)"""
+        self.unlink(slot)
+        self.free_slots.append(slot)
+
+    def active(self, kind, current_time):
+        """Slots of the effects of this kind showing at current_time, oldest first"""
+        slot = self.oldest
+        while slot != NO_SLOT:
+            # Effects end between game steps, before their timer has run
+            if self.kind[slot] == kind and current_time <= self.end_time[slot]:
+                yield slot
+            slot = self.next[slot]
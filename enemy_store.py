@@ -0,0 +1,115 @@
+# Optional column storage for enemies, for arenas with very many of them.
+# Like the bullet pool, every often-used enemy property lives in its own list
+# and enemy number i is found at index i of each list, so the movement, regen
+# and separation systems in game_mechanics.py can run over whole columns.
+# The rest of the game still iterates self.enemies and reads enemy.x,
+# enemy.name and so on: iterating the store gives an EnemyRow per enemy that
+# reads and writes the columns (or the Enemy object for rarely used fields).
+from entities import Enemy, Boss
+
+# Enemy fields kept in columns - everything the per-frame systems touch
+COLUMNS = (
+    "x", "y", "width", "height", "health", "max_health", "speed", "direction",
+    "regen_rate", "last_regen_time",
+    "attack_speed", "last_attack_time", "special_cooldown", "last_special_attack_time",
+    "collision_width", "collision_height", "collision_offset_x", "collision_offset_y",
+)
+
+class EnemyStore:
+    """Enemies kept as parallel columns, usable in place of the enemy list"""
+
+    def __init__(self):
+        for name in COLUMNS:
+            setattr(self, name, [])
+        self.is_boss = []
+        # Step each enemy wants to take this frame, worked out by its plan
+        self.vx = []
+        self.vy = []
+
+        self.records = []  # The Enemy objects, holding the fields without a column
+        self.rows = []  # EnemyRow for each enemy, handed out when iterating
+
+    def columns(self):
+        """Every column, including the ones not taken from Enemy"""
+        return [getattr(self, name) for name in COLUMNS] + [self.is_boss, self.vx, self.vy]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def append(self, enemy):
+        """Add an Enemy (or Boss) - its column fields are copied into the columns"""
+        for name in COLUMNS:
+            getattr(self, name).append(getattr(enemy, name))
+        self.is_boss.append(enemy.is_boss)
+        self.vx.append(0.0)
+        self.vy.append(0.0)
+        self.records.append(enemy)
+        self.rows.append(EnemyRow(self, len(self.rows), enemy))
+
+    def clear(self):
+        """Remove every enemy"""
+        for column in self.columns():
+            column.clear()
+        self.records.clear()
+        self.rows.clear()
+
+    def remove_dead(self):
+        """Drop enemies with no health left, packing the rest to the front"""
+        columns = self.columns()
+        healths = self.health
+        alive_count = 0
+        for i in range(len(self.rows)):
+            if healths[i] <= 0:
+                continue
+            if alive_count != i:
+                for column in columns:
+                    column[alive_count] = column[i]
+                self.records[alive_count] = self.records[i]
+                row = self.rows[i]
+                row.index = alive_count
+                self.rows[alive_count] = row
+            alive_count += 1
+
+        for column in columns:
+            del column[alive_count:]
+        del self.records[alive_count:]
+        del self.rows[alive_count:]
+
+def column_field(name):
+    """Property reading and writing one column of the row's store"""
+    def get(row):
+        return getattr(row.store, name)[row.index]
+    def set(row, value):
+        getattr(row.store, name)[row.index] = value
+    return property(get, set)
+
+def record_field(name):
+    """Property reading and writing a field of the row's Enemy object"""
+    def get(row):
+        return getattr(row.enemy, name)
+    def set(row, value):
+        setattr(row.enemy, name, value)
+    return property(get, set)
+
+class EnemyRow:
+    """One enemy in an EnemyStore, with the same fields as Enemy (and Boss)"""
+
+    __slots__ = ("store", "index", "enemy")
+
+    def __init__(self, store, index, enemy):
+        self.store = store
+        self.index = index  # Kept up to date when the store is packed
+        self.enemy = enemy
+
+    @property
+    def is_boss(self):
+        return self.enemy.is_boss
+
+for _name in Enemy.__slots__ + Boss.__slots__:
+    setattr(EnemyRow, _name, column_field(_name) if _name in COLUMNS else record_field(_name))
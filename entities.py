@@ -0,0 +1,113 @@
+# The things that move around the arena: the player, enemies and bosses.
+# Each is a small class with __slots__, so every field is declared (with a
+# default) in one place, reading a field is a plain attribute access and each
+# object takes much less memory than a dictionary would. Bullets have no
+# class - they live in the columns of the BulletPool (bullet_pool.py).
+
+class Player:
+    """The brawler controlled by the keyboard or a controller"""
+
+    __slots__ = (
+        "x", "y", "width", "height",
+        "health", "max_health", "speed", "damage", "attack_speed", "range", "color",
+        "direction",  # Angle in degrees (0 = right, 90 = down)
+        "last_attack_time", "last_regen_time",
+        # Series shooting: each attack fires burst_max bullets burst_interval ms apart
+        "burst_count", "burst_delay", "burst_max", "burst_interval",
+    )
+
+    def __init__(self, x=0, y=0, width=30, height=30, health=100, speed=5, damage=10,
+                 attack_speed=1.0, range=300, color=(255, 255, 255)):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.health = health
+        self.max_health = health
+        self.speed = speed
+        self.damage = damage
+        self.attack_speed = attack_speed  # Attacks per second
+        self.range = range
+        self.color = color
+        self.direction = 0
+        self.last_attack_time = 0
+        self.last_regen_time = 0  # Time of the last health regeneration
+        self.burst_count = 0  # Shots left in the current series
+        self.burst_delay = 0  # Time of the next shot in the series
+        self.burst_max = 3
+        self.burst_interval = 100
+
+class Enemy:
+    """A robot that hunts the player"""
+
+    __slots__ = (
+        "x", "y", "width", "height",
+        "health", "max_health", "speed", "damage", "attack_speed", "range", "color",
+        "direction", "name",
+        "last_attack_time", "last_regen_time", "regen_rate",
+        # Special attacks (only bosses use them)
+        "special_cooldown", "last_special_attack_time", "attack_pattern",
+        "pending_shots",  # Timers for shots of a burst not fired yet
+        # Plan made by plan_enemy and when it was made (see ai_scheduler.py)
+        "ai_threat_assessment", "last_ai_threat_check", "last_ai_move_time",
+        # Optional collision box smaller than the sprite (None = the whole sprite)
+        "collision_width", "collision_height", "collision_offset_x", "collision_offset_y",
+        "id",  # Optional number that fixes which way the enemy strafes
+        # Picked by the renderer the first time the enemy is drawn
+        "portrait_index", "cached_icon",
+    )
+
+    is_boss = False
+
+    def __init__(self, x=0, y=0, width=30, height=30, health=50, speed=2.0, damage=10,
+                 attack_speed=1.0, range=150, color=(150, 150, 150), direction=0, name="",
+                 last_regen_time=0, regen_rate=0.5, special_cooldown=10000, attack_pattern="normal"):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.health = health
+        self.max_health = health  # Kept for the health bar
+        self.speed = speed
+        self.damage = damage
+        self.attack_speed = attack_speed  # Attacks per second
+        self.range = range
+        self.color = color
+        self.direction = direction
+        self.name = name
+        self.last_attack_time = 0
+        self.last_regen_time = last_regen_time
+        self.regen_rate = regen_rate  # HP per second
+        self.special_cooldown = special_cooldown
+        self.last_special_attack_time = 0
+        self.attack_pattern = attack_pattern
+        self.pending_shots = []
+        self.ai_threat_assessment = None
+        self.last_ai_threat_check = 0
+        self.last_ai_move_time = 0
+        self.collision_width = None
+        self.collision_height = None
+        self.collision_offset_x = 0
+        self.collision_offset_y = 0
+        self.id = None
+        self.portrait_index = None
+        self.cached_icon = None
+
+class Boss(Enemy):
+    """A tougher enemy with a title, an icon and special attacks"""
+
+    __slots__ = (
+        "boss_prefix",  # Title that picks the icon (Chief, Commander, ...)
+        "last_shot_time", "shot_cooldown", "bullet_speed",
+        "collision_box",  # (width, height) - not used for collisions yet
+    )
+
+    is_boss = True
+
+    def __init__(self, boss_prefix="Chief", **fields):
+        super().__init__(**fields)
+        self.boss_prefix = boss_prefix
+        self.last_shot_time = 0
+        self.shot_cooldown = 1500  # milliseconds
+        self.bullet_speed = 8.0
+        self.collision_box = (int(self.width * 0.75), int(self.height * 0.75))
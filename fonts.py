@@ -0,0 +1,35 @@
+# Font registry.
+# pygame.font.SysFont searches the system fonts every time it is called, so
+# every font is created once here and shared. Fullscreen text can ask for the
+# same font at a bigger size and be drawn sharp, instead of being drawn small
+# and stretched afterwards.
+import pygame
+
+class FontRegistry:
+    """Creates each (family, size, bold) font once"""
+
+    def __init__(self):
+        self.fonts = {}  # (family, size, bold) -> Font
+        self.specs = {}  # Font -> (family, size, bold), to find scaled versions
+
+    def get(self, family, size, bold=False):
+        """The font for this family, size and weight"""
+        key = (family, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(family, size, bold=bold)
+            self.fonts[key] = font
+            self.specs[font] = key
+        return font
+
+    def scaled(self, font, scale):
+        """
+        The same font as one from this registry, but scale times bigger.
+
+        Returns None for fonts that weren't made by the registry.
+        """
+        spec = self.specs.get(font)
+        if spec is None:
+            return None
+        family, size, bold = spec
+        return self.get(family, max(1, round(size * scale)), bold)
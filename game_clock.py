@@ -0,0 +1,61 @@
+# Fixed-step simulation clock.
+# Gameplay code reads the time from here instead of pygame.time.get_ticks(),
+# so cooldowns, regeneration and bursts depend on how many simulation steps
+# ran - not on how fast the computer happened to draw the frames.
+# Timed events are scheduled on the clock's timer wheel and run once the
+# simulation time reaches them.
+from timer_wheel import TimerWheel
+
+class GameClock:
+    """Simulation time that advances in fixed steps"""
+
+    def __init__(self, steps_per_second=60, max_steps_per_frame=5):
+        self.step_ms = 1000 / steps_per_second  # Length of one simulation step
+        self.max_steps_per_frame = max_steps_per_frame  # Stop slow frames from snowballing
+        self.reset()
+
+    def reset(self):
+        """Start again from time zero (at the beginning of every match)"""
+        self.time = 0.0  # Simulation time in milliseconds
+        self.steps = 0  # Number of steps taken so far
+        self.accumulator = 0.0  # Real time not yet simulated
+        self.timers = TimerWheel()  # Timers from the last match are dropped
+
+    def get_ticks(self):
+        """Current simulation time in whole milliseconds, like pygame.time.get_ticks()"""
+        return int(self.time)
+
+    def schedule(self, delay_ms, callback, *args):
+        """Run callback(*args) delay_ms milliseconds from now; returns a Timer to cancel it"""
+        return self.timers.schedule(self.get_ticks() + delay_ms, callback, *args)
+
+    def schedule_at(self, time_ms, callback, *args):
+        """Run callback(*args) once the simulation time reaches time_ms"""
+        return self.timers.schedule(time_ms, callback, *args)
+
+    def run_due_timers(self):
+        """Run the callbacks of every timer due by the current time"""
+        self.timers.advance(self.get_ticks())
+
+    def step(self):
+        """Advance the simulation time by one fixed step"""
+        self.time += self.step_ms
+        self.steps += 1
+
+    def steps_due(self, elapsed_ms):
+        """
+        Add real elapsed time and return how many steps should run now.
+
+        Leftover time stays in the accumulator for the next frame. If the game
+        fell far behind (e.g. the window was dragged) the extra time is dropped.
+        """
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+
+        if steps > self.max_steps_per_frame:
+            steps = self.max_steps_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_ms
+
+        return steps
@@ -5,6 +5,22 @@ import os
 import math
 from enum import Enum
 from sprites import SpriteManager
+from game_clock import GameClock
+from collision_grid import WallGrid
+from line_of_sight import LineOfSight
+from bullet_pool import BulletPool
+from spatial_hash import SpatialHash
+from cover_index import CoverIndex
+from ai_scheduler import AIScheduler
+from cooldowns import CooldownTracker
+from text_cache import TextCache
+from assets import AssetRegistry
+from fonts import FontRegistry
+from render_queue import RenderQueue
+from widgets import WidgetCache
+from effects import EffectSystem
+from entities import Player
+from enemy_store import EnemyStore
 
 # Import brawler data
 from brawlers import BRAWLERS
@@ -20,7 +36,8 @@ class GameState(Enum):
 # Game constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # Rendered frames per second
+SIMULATION_RATE = 60  # Gameplay updates per second of game time
 
 # Colors
 WHITE = (255, 255, 255)
@@ -33,16 +50,39 @@ PURPLE = (128, 0, 128)
 BROWN = (165, 42, 42)
 
 class PyBrawl:
-    def __init__(self):
-        """Initialize the game components"""
-        # Set up the display
-        pygame.init()
-        
-        # Initialize the window
-        pygame.display.set_caption("Py Brawl")
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, headless=False, controller=None, preload_assets=True):
+        """Initialize the game components
+        
+        Args:
+            headless: Run the simulation only - no window, sounds or fonts
+            controller: Object with a get_actions(game) method that drives the
+                player instead of the keyboard (used by headless runs)
+            preload_assets: Start decoding the menu images on a background
+                thread while the rest of the game loads
+        """
+        # Headless mode skips everything that needs a display or audio device,
+        # so pygame's display, sound and font modules are never started
+        self.headless = headless
+        if not headless:
+            pygame.init()
+        self.controller = controller
+        
+        # Initialize the window. Everything is drawn on self.screen, which is
+        # the window itself unless a logical surface is used (see toggle_fullscreen)
+        if headless:
+            self.screen = None
+        else:
+            pygame.display.set_caption("Py Brawl")
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.display = self.screen
         self.clock = pygame.time.Clock()
         
+        # Gameplay runs on its own fixed-step clock, separate from drawing
+        self.game_clock = GameClock(SIMULATION_RATE)
+        
+        # Kill notifications and floating text, in a fixed number of slots
+        self.effects = EffectSystem(self.game_clock)
+        
         # Initialize fullscreen variables
         self.is_fullscreen = False
         self.x_offset = 0
@@ -51,15 +91,39 @@ class PyBrawl:
         self.original_width = SCREEN_WIDTH
         self.original_height = SCREEN_HEIGHT
         
-        # Initialize sprite manager
-        self.sprite_manager = SpriteManager()
+        # In fullscreen, draw at 800x600 on a logical surface and scale the
+        # finished frame into the letterbox once, instead of scaling every
+        # single thing that is drawn. scale_factor and the offsets then stay
+        # at 1 and 0 for drawing; the display_ values below map the logical
+        # surface onto the real display (and mouse positions back)
+        self.use_logical_surface = True
+        self.display_scale = 1.0
+        self.display_x_offset = 0
+        self.display_y_offset = 0
+        self.scaled_frame = None  # Reused target for the final scale
+        
+        # Ground, walls and bushes pre-drawn into one surface (see draw_map).
+        # Set back to None whenever the map or the display scale changes.
+        self.map_layer = None
+        
+        # Dirty rectangle mode: instead of flipping the whole screen, gameplay
+        # frames repaint and send to the display only the areas where
+        # something was drawn this frame or the last (see draw_gameplay)
+        self.use_dirty_rects = False
+        self.drawn_rects = []  # Screen areas drawn over this frame
+        self.previous_drawn_rects = None  # Last frame's areas, None = redraw everything
+        self.update_rects = None  # Areas to send to the display, None = whole screen
+        
+        # Initialize sprite manager (sprites need a display to convert to)
+        if not headless:
+            self.sprite_manager = SpriteManager()
         
         # Game state
         self.state = GameState.TITLE
         self.selected_brawler = None
         self.player = None
         self.enemies = []
-        self.bullets = []
+        self.bullets = BulletPool()
         self.score = 0
         
         # Map elements
@@ -68,20 +132,76 @@ class PyBrawl:
         self.map_width = 20  # Number of tiles horizontally
         self.map_height = 15  # Number of tiles vertically
         self.tile_size = 40  # Size of each tile
+        self.wall_grid = WallGrid(self.walls, self.map_width, self.map_height, self.tile_size)
+        self.vision = LineOfSight(self.wall_grid)
+        self.cover_index = CoverIndex(self.wall_grid, self.vision)  # Hiding spots for retreating enemies
+        self.enemy_hash = SpatialHash(self.tile_size * 2)  # Rebuilt every frame for bullet hits
+        
+        # Enemy decisions are spread over frames under a time budget. Headless
+        # runs have no frame rate to protect and must give the same result
+        # every time, so they have no budget.
+        self.ai_scheduler = AIScheduler(time_budget_ms=None) if headless else AIScheduler()
+        
+        # Enemies whose attack cooldowns are running or that are hurt
+        self.cooldowns = CooldownTracker()
+        
+        # Precompute line of sight between all tiles after generating a map.
+        # Lookups are tile-to-tile, so they are close to (not exactly) the
+        # per-frame checks - worth it on big arenas with many enemies.
+        self.use_visibility_table = False
+        
+        # Keep enemies in the columns of an EnemyStore instead of a list, so
+        # movement, regen and separation run as passes over whole columns
+        # (meant for load tests with very many enemies). Takes effect on the
+        # next reset_game().
+        self.use_enemy_store = False
+        
+        # Rendered text is reused between frames (see draw_text)
+        self.text_cache = TextCache()
+        
+        # Gameplay sprites and text are collected here and drawn per layer
+        self.render_queue = RenderQueue()
+        
+        # Health bars, ammo bars and enemy nameplates are drawn once and reused
+        self.widgets = WidgetCache(self.text_cache)
+        
+        # Headless runs have no fonts, sounds or images - play_sound() simply
+        # finds nothing to play
+        self.sounds = {}
+        self.brawler_images = {}
+        self.preload_assets = preload_assets  # Decode menu images on a background thread
+        if not headless:
+            self.load_media()
+        
+        # Wave tracking
+        self.current_wave = 0
+        self.max_waves = 3
+        self.wave_size = 5  # Number of enemies per wave
+        
+        # Add persistent sets to track used name words across all waves
+        self.used_first_words = set()
+        self.used_second_words = set()
+        self.used_names = set()
+    
+    def load_media(self):
+        """Load fonts, sounds and images used by the windowed game"""
+        # Menu backgrounds - decoding can run while the rest loads
+        self.assets = AssetRegistry()
+        if self.preload_assets:
+            self.assets.start_preload()
         
-        # Load fonts
-        self.title_font = pygame.font.SysFont("Arial", 72, bold=True)
-        self.menu_font = pygame.font.SysFont("Arial", 36)
-        self.info_font = pygame.font.SysFont("Arial", 24)
-        self.bot_nickname_font = pygame.font.SysFont("Arial", 16)  # Smaller font for bot nicknames
+        # Load fonts (any other size is also fetched from the registry, never created per frame)
+        self.fonts = FontRegistry()
+        self.title_font = self.fonts.get("Arial", 72, bold=True)
+        self.menu_font = self.fonts.get("Arial", 36)
+        self.info_font = self.fonts.get("Arial", 24)
+        self.bot_nickname_font = self.fonts.get("Arial", 16)  # Smaller font for bot nicknames
         
         # Initialize sounds
         pygame.mixer.init()
-        self.sounds = {}
         self.load_sounds()
         
         # Try to load brawler images, if not available, use colored rectangles
-        self.brawler_images = {}
         for brawler_name in BRAWLERS:
             try:
                 img_path = os.path.join("assets", "images", "brawlers", BRAWLERS[brawler_name]["image"])
@@ -91,16 +211,6 @@ class PyBrawl:
             except:
                 # If image loading fails, we'll use colored rectangles later
                 pass
-        
-        # Wave tracking
-        self.current_wave = 0
-        self.max_waves = 3
-        self.wave_size = 5  # Number of enemies per wave
-        
-        # Add persistent sets to track used name words across all waves
-        self.used_first_words = set()
-        self.used_second_words = set()
-        self.used_names = set()
     
     def load_sounds(self):
         """Load sound effects using a simplified approach"""
@@ -190,12 +300,13 @@ class PyBrawl:
     def toggle_fullscreen(self):
         """Toggle between fullscreen and windowed mode"""
         self.is_fullscreen = not self.is_fullscreen
+        self.map_layer = None  # The map has to be drawn again at the new scale
         
         if self.is_fullscreen:
             # For Mac, the display info doesn't always work correctly before going fullscreen
             
             # First, go to fullscreen using the system's native resolution
-            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
             
             # Now get the actual resolution we're running at
             screen_width = pygame.display.Info().current_w
@@ -214,31 +325,63 @@ class PyBrawl:
             height_scale = screen_height / self.original_height
             
             # Use the smaller scale to ensure the entire game fits on screen
-            self.scale_factor = min(width_scale, height_scale)
+            self.display_scale = min(width_scale, height_scale)
             
             # Calculate centered position for the game surface
             # This ensures equal empty space on left and right sides
-            self.x_offset = int((screen_width - (self.original_width * self.scale_factor)) / 2)
-            self.y_offset = int((screen_height - (self.original_height * self.scale_factor)) / 2)
+            self.display_x_offset = int((screen_width - (self.original_width * self.display_scale)) / 2)
+            self.display_y_offset = int((screen_height - (self.original_height * self.display_scale)) / 2)
             
             print(f"Fullscreen mode: Screen size = {screen_width}x{screen_height}")
-            print(f"Scale factor = {self.scale_factor}")
-            print(f"Offsets: x = {self.x_offset}, y = {self.y_offset}")
+            print(f"Scale factor = {self.display_scale}")
+            print(f"Offsets: x = {self.display_x_offset}, y = {self.display_y_offset}")
             
             # Fill screen with black to cover areas outside the game
-            self.screen.fill((0, 0, 0))
+            self.display.fill((0, 0, 0))
+            
+            if self.use_logical_surface:
+                # Draw at the original size and scale whole frames (see present_frame)
+                self.screen = pygame.Surface((self.original_width, self.original_height)).convert()
+                self.scaled_frame = pygame.Surface((
+                    int(self.original_width * self.display_scale),
+                    int(self.original_height * self.display_scale)
+                )).convert()
+                self.scale_factor = 1.0
+                self.x_offset = 0
+                self.y_offset = 0
+            else:
+                # Draw straight onto the display, scaling everything as it is drawn
+                self.screen = self.display
+                self.scale_factor = self.display_scale
+                self.x_offset = self.display_x_offset
+                self.y_offset = self.display_y_offset
         else:
             # Switch back to windowed mode
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.scale_factor = 1.0
-            self.x_offset = 0
-            self.y_offset = 0
+            self.display = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.screen = self.display
+            self.scaled_frame = None
+            self.scale_factor = self.display_scale = 1.0
+            self.x_offset = self.display_x_offset = 0
+            self.y_offset = self.display_y_offset = 0
+        
+        # Scaled sprites made for the old size won't be used again, and every
+        # sprite is converted for the new display mode
+        if hasattr(self, 'sprite_manager'):
+            self.sprite_manager.set_scale_factor(self.scale_factor)
+            self.sprite_manager.finalize_sprites()
+        self.text_cache.clear()
+        self.widgets.clear()
+        
+        # Menu backgrounds have to be converted and scaled for the new mode
+        if hasattr(self, 'assets'):
+            self.assets.reset_display()
     
     def run(self):
         """Main game loop"""
+        elapsed_ms = 0  # Real time spent on the previous frame
         while True:
-            # Clear the screen first
-            if self.is_fullscreen:
+            # Clear the screen first (gameplay clears only what it needs to)
+            if self.is_fullscreen and self.state != GameState.GAMEPLAY:
                 self.screen.fill((0, 0, 0))
             
             # Handle input based on current game state
@@ -249,8 +392,14 @@ class PyBrawl:
                 self.handle_character_select_input()
                 self.draw_character_select()
             elif self.state == GameState.GAMEPLAY:
-                self.handle_gameplay_input()
-                self.update_gameplay()
+                actions = self.handle_gameplay_input()
+                
+                # Run as many fixed simulation steps as real time allows
+                for _ in range(self.game_clock.steps_due(elapsed_ms)):
+                    if self.state != GameState.GAMEPLAY:
+                        break
+                    self.simulate_step(actions)
+                
                 self.draw_gameplay()
             elif self.state == GameState.GAME_OVER:
                 self.handle_game_over_input()
@@ -260,16 +409,77 @@ class PyBrawl:
                 self.draw_win_screen()
             
             # Update display
-            pygame.display.flip()
+            self.present_frame()
             
             # Control game speed
-            self.clock.tick(FPS)
+            elapsed_ms = self.clock.tick(FPS)
+    
+    def present_frame(self):
+        """Show the frame that was just drawn"""
+        if self.screen is not self.display:
+            # Scale the logical surface into the letterbox in one go
+            pygame.transform.smoothscale(self.screen, self.scaled_frame.get_size(), self.scaled_frame)
+            self.display.blit(self.scaled_frame, (self.display_x_offset, self.display_y_offset))
+            pygame.display.flip()
+        elif self.state == GameState.GAMEPLAY and self.use_dirty_rects and self.update_rects is not None:
+            # Only the areas that changed
+            pygame.display.update(self.update_rects)
+        else:
+            pygame.display.flip()
+        
+        # Other screens draw over everything, so gameplay has to start over
+        if self.state != GameState.GAMEPLAY:
+            self.previous_drawn_rects = None
+    
+    def simulate_step(self, actions):
+        """Advance the gameplay by one fixed step of the game clock"""
+        self.apply_player_actions(actions)
+        
+        # Timed events due by now: burst shots, effects running out
+        self.game_clock.run_due_timers()
+        
+        self.update_gameplay()
+        self.game_clock.step()
+    
+    def run_headless(self, brawler_name="Shelly", max_frames=36000):
+        """
+        Play one match without a window, as fast as the CPU allows.
+        
+        The player is driven by self.controller instead of the keyboard.
+        Returns a dictionary summarizing how the match ended.
+        """
+        if self.controller is None:
+            raise ValueError("Headless runs need a controller to drive the player")
+        
+        self.reset_game(brawler_name)
+        
+        frames = 0
+        while self.state == GameState.GAMEPLAY and frames < max_frames:
+            # One frame is one simulation step, so results don't depend on CPU speed
+            self.simulate_step(self.controller.get_actions(self))
+            frames += 1
+        
+        return {
+            "brawler": brawler_name,
+            "result": self.state.name,
+            "won": self.state == GameState.WIN_SCREEN,
+            "score": self.score,
+            "wave": self.current_wave,
+            "frames": frames,
+            "player_health": self.player.health
+        }
     
     def reset_game(self, brawler_name):
         """Reset the game state to start a new game with the selected brawler"""
         self.selected_brawler = brawler_name
         brawler_data = BRAWLERS[brawler_name]
         
+        # Every match starts at game time zero
+        self.game_clock.reset()
+        self.ai_scheduler.reset()
+        self.cooldowns.reset()
+        self.effects.reset()
+        
         # Generate map first (walls and bushes)
         self.generate_map()
         
@@ -279,21 +489,18 @@ class PyBrawl:
         safe_position = self.find_safe_spawn_position(player_width, player_height)
         
         # Create player with safe spawn position
-        self.player = {
-            "x": safe_position[0],
-            "y": safe_position[1],
-            "width": player_width,
-            "height": player_height,
-            "health": brawler_data["health"],
-            "max_health": brawler_data["health"],
-            "speed": brawler_data["speed"],
-            "damage": brawler_data["damage"],
-            "attack_speed": brawler_data["attack_speed"],
-            "range": brawler_data["range"],
-            "last_attack_time": 0,
-            "color": brawler_data["color"],
-            "direction": 0  # Angle in degrees
-        }
+        self.player = Player(
+            x=safe_position[0],
+            y=safe_position[1],
+            width=player_width,
+            height=player_height,
+            health=brawler_data["health"],
+            speed=brawler_data["speed"],
+            damage=brawler_data["damage"],
+            attack_speed=brawler_data["attack_speed"],
+            range=brawler_data["range"],
+            color=brawler_data["color"]
+        )
         
         # Load player sprite based on selected brawler
         sprite_key = None
@@ -308,7 +515,10 @@ class PyBrawl:
             sprite_key = "custom"  # If you have a custom sprite for the custom brawler
         
         # Try to load the sprite from the sprite manager
-        if hasattr(self, 'sprite_manager') and sprite_key:
+        if self.headless:
+            # Nothing is drawn in headless mode
+            self.player_sprite = None
+        elif hasattr(self, 'sprite_manager') and sprite_key:
             if sprite_key == "custom":
                 # For custom sprite, try to load directly from the assets folder
                 custom_path = os.path.join("assets", "sprite.png")
@@ -339,8 +549,8 @@ class PyBrawl:
             self.player_sprite = None
         
         # Clear previous game objects
-        self.enemies = []
-        self.bullets = []
+        self.enemies = EnemyStore() if self.use_enemy_store else []
+        self.bullets.clear()
         self.score = 0
         self.current_wave = 0
         
@@ -389,22 +599,11 @@ class PyBrawl:
     
     def position_collides_with_walls(self, x, y, width, height):
         """Check if a position collides with any walls"""
-        # Create a rect for the position
-        position_rect = pygame.Rect(x, y, width, height)
-        
-        # Check collision with each wall
-        for wall in self.walls:
-            wall_rect = pygame.Rect(
-                wall["x"], wall["y"], 
-                wall["width"], wall["height"]
-            )
-            
-            # Add a small buffer around walls for safer spawning
-            wall_rect_with_buffer = wall_rect.inflate(10, 10)
-            
-            if position_rect.colliderect(wall_rect_with_buffer):
-                return True
-        
-        return False
+        # Add a small buffer around walls for safer spawning - growing the
+        # position by 5 pixels on each side is the same as growing every wall
+        buffer = 5
+        return self.wall_grid.rect_overlaps_wall(
+            x - buffer, y - buffer, width + buffer * 2, height + buffer * 2
+        )
     
     # The rest of the implementation is in game_mechanics.py and game_rendering.py
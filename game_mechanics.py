@@ -1,8 +1,14 @@
-import pygame
 import random
 import math
 import sys
 from game_engine import GameState, SCREEN_WIDTH, SCREEN_HEIGHT, PyBrawl
+from collision_grid import WallGrid
+from line_of_sight import LineOfSight, VisibilityTable
+from spatial_hash import SpatialHash
+from cover_index import CoverIndex
+from effects import KILL_NOTICE, FLOATING_TEXT
+from entities import Enemy, Boss
+from enemy_store import EnemyStore
 
 # Arrays for dynamic enemy name generation
 WHO = [
@@ -50,9 +56,17 @@ TERMS = [
     "Sprinter"
 ]
 
+# Above this many enemies, separate_enemies() uses a neighbor grid instead of checking every pair
+SEPARATION_GRID_THRESHOLD = 16
+
+# A boss's burst attack fires this many bullets, this many milliseconds apart
+BOSS_BURST_SHOTS = 3
+BOSS_BURST_INTERVAL = 100
+
 def generate_map(self):
     """Generate the game map with walls and bushes"""
     max_attempts = 10  # Maximum attempts to generate a valid map
+    self.map_layer = None  # Redrawn for the new map on the next frame
     
     for attempt in range(max_attempts):
         # Clear existing map elements
@@ -84,10 +98,15 @@ def generate_map(self):
                         "height": self.tile_size
                     })
         
+        # Index the walls by tile for fast collision checks
+        self.build_wall_grid()
+        
         # Check if map is fully connected (all open areas are reachable)
         if self.is_map_fully_connected():
             # Map is good, now add bushes
             self.add_bushes()
+            self.prepare_visibility()
+            self.build_cover_index()
             return  # Successfully generated a connected map
         
         # If we get here, map generation failed this attempt
@@ -109,8 +128,27 @@ def generate_map(self):
         self.walls.append({"x": (self.map_width-1) * self.tile_size, "y": y * self.tile_size, 
                           "width": self.tile_size, "height": self.tile_size})
     
+    self.build_wall_grid()
+    
     # Add a few bushes to the simple map
     self.add_bushes()
+    self.prepare_visibility()
+    self.build_cover_index()
+
+def build_wall_grid(self):
+    """Rebuild the tile occupancy grid (and line of sight on top of it) from the current walls"""
+    self.wall_grid = WallGrid(self.walls, self.map_width, self.map_height, self.tile_size)
+    self.vision = LineOfSight(self.wall_grid)
+
+def prepare_visibility(self):
+    """Precompute tile-to-tile line of sight for the finished map, if enabled"""
+    if self.use_visibility_table:
+        # Tables are cached on disk by map layout, so repeated maps load instantly
+        self.vision.use_table(VisibilityTable.load_or_build(self.wall_grid))
+
+def build_cover_index(self):
+    """Find the hiding spots of the finished map for retreating enemies"""
+    self.cover_index = CoverIndex(self.wall_grid, self.vision)
 
 def add_bushes(self):
     """Add bushes to the map"""
@@ -120,14 +158,14 @@ def add_bushes(self):
         y = random.randint(1, self.map_height - 2) * self.tile_size
         
         # Check if the position isn't occupied by a wall
-        if not any(w["x"] == x and w["y"] == y for w in self.walls):
+        if not self.wall_grid.point_in_wall(x, y):
             # Create bush clusters
             for dx, dy in [(0, 0), (1, 0), (0, 1), (1, 1), (-1, 0), (0, -1)]:
                 if random.random() < 0.6:  # 60% chance to place adjacent bush
                     bush_x = x + dx * self.tile_size
                     bush_y = y + dy * self.tile_size
                     # Check if this position doesn't overlap with walls
-                    if not any(w["x"] == bush_x and w["y"] == bush_y for w in self.walls):
+                    if not self.wall_grid.point_in_wall(bush_x, bush_y):
                         self.bushes.append({
                             "x": bush_x, 
                             "y": bush_y,
@@ -141,13 +179,10 @@ def is_map_fully_connected(self):
     grid = [[0 for _ in range(self.map_height)] for _ in range(self.map_width)]
     
     # Mark walls as obstacles (1)
-    for wall in self.walls:
-        grid_x = wall["x"] // self.tile_size
-        grid_y = wall["y"] // self.tile_size
-        
-        # Skip if outside valid grid range
-        if 0 <= grid_x < self.map_width and 0 <= grid_y < self.map_height:
-            grid[grid_x][grid_y] = 1
+    for grid_x in range(self.map_width):
+        for grid_y in range(self.map_height):
+            if self.wall_grid.is_wall_tile(grid_x, grid_y):
+                grid[grid_x][grid_y] = 1
     
     # Count total number of open spaces
     total_open_spaces = sum(row.count(0) for row in grid)
@@ -218,16 +253,10 @@ def spawn_enemies(self, count):
             y = random.randint(1, self.map_height - 2) * self.tile_size
             
             # Check if the position isn't occupied by a wall
-            wall_collision = any(
-                x < w["x"] + w["width"] and 
-                x + self.tile_size > w["x"] and 
-                y < w["y"] + w["height"] and 
-                y + self.tile_size > w["y"] 
-                for w in self.walls
-            )
+            wall_collision = self.wall_grid.rect_overlaps_wall(x, y, self.tile_size, self.tile_size)
             
             # Make sure it's not too close to the player
-            player_dist = math.sqrt((x - self.player["x"])**2 + (y - self.player["y"])**2)
+            player_dist = math.sqrt((x - self.player.x)**2 + (y - self.player.y)**2)
             if not wall_collision and player_dist > 200:
                 break
         
@@ -278,39 +307,33 @@ def spawn_enemies(self, count):
         self.used_names.add(enemy_name)
         
         # Create enemy with random attributes        
-        self.enemies.append({
-            "x": x,
-            "y": y,
-            "width": 30,
-            "height": 30,
-            "health": health,
-            "max_health": health,  # Store max health for HP bar calculation
-            "speed": random.uniform(1.0, 3.0),
-            "damage": 10,
-            "attack_speed": random.uniform(0.5, 1.5),
-            "range": 150,
-            "last_attack_time": 0,
-            "last_regen_time": pygame.time.get_ticks(),  # Track time for health regeneration
-            "regen_rate": random.uniform(0.5, 1.0),  # HP per second
-            "color": (
+        self.enemies.append(Enemy(
+            x=x,
+            y=y,
+            width=30,
+            height=30,
+            health=health,
+            speed=random.uniform(1.0, 3.0),
+            damage=10,
+            attack_speed=random.uniform(0.5, 1.5),
+            range=150,
+            last_regen_time=self.game_clock.get_ticks(),  # Track time for health regeneration
+            regen_rate=random.uniform(0.5, 1.0),  # HP per second
+            color=(
                 random.randint(100, 200),
                 random.randint(100, 200),
                 random.randint(100, 200)
             ),
-            "direction": random.uniform(0, 360),
-            "name": enemy_name,  # Add the random name
-            "is_boss": False,  # Flag to indicate this is not a boss
-            
-            # Add default special attack properties (not used by regular enemies, but prevent KeyErrors)
-            "special_cooldown": 10000,  # Higher cooldown than bosses
-            "last_special_attack_time": 0,
-            "attack_pattern": "normal"  # Default pattern
-        })
+            direction=random.uniform(0, 360),
+            name=enemy_name
+        ))
+        self.cooldowns.track(self.enemies[-1])
     
     # Spawn boss enemies (if applicable)
     for _ in range(boss_count):
         boss_enemy = self.spawn_boss()
         self.enemies.append(boss_enemy)
+        self.cooldowns.track(self.enemies[-1])
 
 def spawn_boss(self):
     """Spawn a boss enemy"""
@@ -329,16 +352,10 @@ def spawn_boss(self):
         y = max(1, min(self.map_height - 2, y // self.tile_size)) * self.tile_size
         
         # Check if the position isn't occupied by a wall
-        wall_collision = any(
-            x < w["x"] + w["width"] and 
-            x + self.tile_size > w["x"] and 
-            y < w["y"] + w["height"] and 
-            y + self.tile_size > w["y"] 
-            for w in self.walls
-        )
+        wall_collision = self.wall_grid.rect_overlaps_wall(x, y, self.tile_size, self.tile_size)
         
         # Make sure it's not too close to the player
-        player_dist = math.sqrt((x - self.player["x"])**2 + (y - self.player["y"])**2)
+        player_dist = math.sqrt((x - self.player.x)**2 + (y - self.player.y)**2)
         if not wall_collision and player_dist > 300:  # Boss should be further away initially
             break
     
@@ -403,57 +420,31 @@ def spawn_boss(self):
     boss_color = random.choice(boss_colors)
     
     # Create the boss enemy with enhanced attributes
-    boss_enemy = {
-        "x": x,
-        "y": y,
-        "width": self.tile_size,
-        "height": self.tile_size,
-        "speed": 3.0,  # Slightly faster to make bosses more dangerous
-        "health": boss_health,
-        "max_health": boss_health,
-        "color": boss_color,
-        "direction": random.randint(0, 360),
-        "last_shot_time": 0,
-        "shot_cooldown": 1500,  # milliseconds
-        "bullet_speed": 8.0,  # Faster bullets
-        "is_boss": True,  # Flag to indicate it's a boss
-        "boss_prefix": boss_prefix,  # Store the prefix for icon selection
-        "name": boss_name,  # The enemy's name
-        "last_ai_move_time": 0,
-        "last_ai_threat_check": 0,
-        "ai_threat_assessment": None,
-        "collision_box": {  # Smaller collision box to allow movement
-            "width": int(self.tile_size * 0.75),
-            "height": int(self.tile_size * 0.75)
-        },
-        # Add missing attributes needed for enemy logic
-        "range": 250,  # Bosses have longer attack range
-        "damage": 20,  # Bosses deal more damage
-        "attack_speed": 2.0,  # Attacks per second
-        "last_attack_time": 0, 
-        "last_regen_time": pygame.time.get_ticks(),
-        "regen_rate": 2.0,  # Bosses regenerate faster
-        
-        # Special attack properties
-        "special_cooldown": 5000,  # 5 seconds between special attacks
-        "last_special_attack_time": 0,
-        "attack_pattern": random.choice(["spread", "burst", "sniper"])  # Randomly assign an attack pattern
-    }
+    boss_enemy = Boss(
+        x=x,
+        y=y,
+        width=self.tile_size,
+        height=self.tile_size,
+        speed=3.0,  # Slightly faster to make bosses more dangerous
+        health=boss_health,
+        color=boss_color,
+        direction=random.randint(0, 360),
+        boss_prefix=boss_prefix,  # Store the prefix for icon selection
+        name=boss_name,
+        range=250,  # Bosses have longer attack range
+        damage=20,  # Bosses deal more damage
+        attack_speed=2.0,  # Attacks per second
+        last_regen_time=self.game_clock.get_ticks(),
+        regen_rate=2.0,  # Bosses regenerate faster
+        special_cooldown=5000,  # 5 seconds between special attacks
+        attack_pattern=random.choice(["spread", "burst", "sniper"])  # Randomly assign an attack pattern
+    )
     
     return boss_enemy
 
 def create_bullet(self, x, y, direction, damage, is_player, color=(255, 255, 255)):
     """Create a bullet object"""
-    self.bullets.append({
-        "x": x,
-        "y": y,
-        "radius": 5,
-        "speed": 10,
-        "damage": damage,
-        "direction": direction,
-        "is_player": is_player,
-        "color": color
-    })
+    self.bullets.spawn(x, y, direction, 10, 5, damage, is_player, color)
 
 def update_gameplay(self):
     """Update all gameplay elements"""
@@ -462,10 +453,6 @@ def update_gameplay(self):
     self.update_enemies()
     self.update_player_health_regeneration()
     
-    # Initialize kill notifications list if it doesn't exist
-    if not hasattr(self, 'kill_notifications'):
-        self.kill_notifications = []
-    
     # Check if all enemies are dead
     if self.player is not None and len(self.enemies) == 0:
         # If we haven't completed all waves, start the next wave
@@ -478,484 +465,531 @@ def update_gameplay(self):
 
 def update_bullets(self):
     """Update positions and collisions for all bullets"""
-    bullets_to_remove = []
+    # The bullets live in the columns of a BulletPool. Every bullet is moved
+    # and tested in a single pass, and surviving bullets are packed to the
+    # front of the columns as we go, so nothing is ever popped from a list.
+    pool = self.bullets
+    xs, ys = pool.x, pool.y
+    vxs, vys = pool.vx, pool.vy
+    radii = pool.radius
+    damages = pool.damage
+    is_player = pool.is_player
+    wall_grid = self.wall_grid
+    
+    # Bucket every enemy's collision box in the spatial hash, so each bullet
+    # only tests the enemies in the cells it overlaps
+    enemies = self.enemies
+    enemy_boxes = []
+    enemy_hash = self.enemy_hash
+    enemy_hash.clear()
+    for j, enemy in enumerate(enemies):
+        # Enemy collision rectangle
+        if enemy.collision_width is not None:
+            box = (
+                enemy.x + enemy.collision_offset_x,
+                enemy.y + enemy.collision_offset_y,
+                enemy.collision_width,
+                enemy.collision_height
+            )
+        else:
+            box = (enemy.x, enemy.y, enemy.width, enemy.height)
+        enemy_boxes.append(box)
+        enemy_hash.insert(j, *box)
+    enemies_killed = False
+    
+    player = self.player
+    player_left = player.x
+    player_top = player.y
+    player_right = player_left + player.width
+    player_bottom = player_top + player.height
     
-    for i, bullet in enumerate(self.bullets):
-        # Update bullet position
-        angle_rad = math.radians(bullet["direction"])
-        bullet["x"] += math.cos(angle_rad) * bullet["speed"]
-        bullet["y"] += math.sin(angle_rad) * bullet["speed"]
+    alive_count = 0
+    for i in range(pool.count):
+        # Update bullet position with the velocity worked out when it was fired
+        x = xs[i] + vxs[i]
+        y = ys[i] + vys[i]
+        xs[i] = x
+        ys[i] = y
         
         # Check if bullet is out of bounds
-        if (bullet["x"] < 0 or bullet["x"] > SCREEN_WIDTH or
-            bullet["y"] < 0 or bullet["y"] > SCREEN_HEIGHT):
-            bullets_to_remove.append(i)
+        if x < 0 or x > SCREEN_WIDTH or y < 0 or y > SCREEN_HEIGHT:
             continue
         
-        # Create bullet collision rectangle
-        bullet_rect = pygame.Rect(
-            bullet["x"] - bullet["radius"], 
-            bullet["y"] - bullet["radius"],
-            bullet["radius"] * 2, 
-            bullet["radius"] * 2
-        )
+        # Bullet collision rectangle
+        radius = radii[i]
+        left = x - radius
+        top = y - radius
+        size = radius * 2
+        
+        hit = False
         
         # Check for wall collisions
-        for wall in self.walls:
-            wall_rect = pygame.Rect(wall["x"], wall["y"], wall["width"], wall["height"])
-            
-            if bullet_rect.colliderect(wall_rect):
-                bullets_to_remove.append(i)
-                break
+        if wall_grid.rect_overlaps_wall(left, top, size, size):
+            hit = True
         
         # Check for enemy collisions if player bullet
-        if bullet["is_player"]:
-            for j, enemy in enumerate(self.enemies):
-                # Create enemy collision rectangle
-                if "collision_width" in enemy:
-                    enemy_rect = pygame.Rect(
-                        enemy["x"] + enemy["collision_offset_x"], 
-                        enemy["y"] + enemy["collision_offset_y"], 
-                        enemy["collision_width"], 
-                        enemy["collision_height"]
-                    )
-                else:
-                    enemy_rect = pygame.Rect(
-                        enemy["x"], enemy["y"], enemy["width"], enemy["height"]
-                    )
+        if is_player[i]:
+            candidates = enemy_hash.query(left, top, size, size)
+            if len(candidates) > 1:
+                candidates = sorted(candidates)  # Earlier enemies get hit first
+            
+            for j in candidates:
+                enemy = enemies[j]
+                
+                # Enemies killed earlier this frame are removed after the loop
+                if enemy.health <= 0:
+                    continue
                 
-                if bullet_rect.colliderect(enemy_rect):
+                enemy_left, enemy_top, enemy_width, enemy_height = enemy_boxes[j]
+                if (left < enemy_left + enemy_width and left + size > enemy_left and
+                    top < enemy_top + enemy_height and top + size > enemy_top):
                     # Damage enemy
-                    enemy["health"] -= bullet["damage"]
-                    bullets_to_remove.append(i)
+                    enemy.health -= damages[i]
+                    hit = True
                     
                     # Check if enemy is dead
-                    if enemy["health"] <= 0:
-                        # Add kill notification with current time
-                        if hasattr(self, 'kill_notifications'):
-                            self.kill_notifications.append({
-                                'name': enemy["name"],
-                                'time': pygame.time.get_ticks()
-                            })
+                    if enemy.health > 0:
+                        self.cooldowns.was_hit(enemy)
+                    else:
+                        self.cooldowns.forget(enemy)
+                        
+                        # Shots it still had queued up are never fired
+                        for timer in enemy.pending_shots:
+                            timer.cancel()
                         
-                        # Remove enemy and increase score
-                        self.enemies.pop(j)
+                        # Add kill notification, shown for 3 seconds
+                        self.effects.spawn(
+                            KILL_NOTICE, enemy.name, 0, 0, (255, 255, 255),
+                            self.game_clock.get_ticks(), 3000
+                        )
+                        
+                        # Increase score - the enemy is removed after the loop
+                        enemies_killed = True
                         self.score += 100
                     
                     break
         # Check for player collision if enemy bullet
-        elif not bullet["is_player"]:
-            player_rect = pygame.Rect(
-                self.player["x"], self.player["y"],
-                self.player["width"], self.player["height"]
-            )
+        elif (left < player_right and left + size > player_left and
+              top < player_bottom and top + size > player_top):
+            # Hit the player
+            player.health -= damages[i]
+            hit = True
             
-            if bullet_rect.colliderect(player_rect):
-                # Hit the player
-                self.player["health"] -= bullet["damage"]
-                bullets_to_remove.append(i)
-                
-                # Check if player is defeated
-                if self.player["health"] <= 0:
-                    self.state = GameState.GAME_OVER
-                    break
+            # Check if player is defeated
+            if player.health <= 0:
+                self.state = GameState.GAME_OVER
+        
+        # Keep the bullet by packing it into the next free slot
+        if not hit:
+            if alive_count != i:
+                pool.move(i, alive_count)
+            alive_count += 1
     
-    # Remove bullets marked for deletion (in reverse order to avoid index issues)
-    for i in sorted(bullets_to_remove, reverse=True):
-        if i < len(self.bullets):
-            self.bullets.pop(i)
+    pool.count = alive_count
+    
+    # Remove the enemies killed this frame in one go
+    if enemies_killed:
+        if isinstance(enemies, EnemyStore):
+            enemies.remove_dead()
+        else:
+            self.enemies[:] = [enemy for enemy in enemies if enemy.health > 0]
+
+def plan_enemies(self, indices, current_time):
+    """Make new plans for the enemies at these indices"""
+    enemies = self.enemies
+    planned = [enemies[index] for index in indices]
+    
+    # Line of sight from every planning enemy to the player, answered in one batch
+    player_center_x = self.player.x + self.player.width / 2
+    player_center_y = self.player.y + self.player.height / 2
+    enemy_centers = [
+        (enemy.x + enemy.width / 2, enemy.y + enemy.height / 2)
+        for enemy in planned
+    ]
+    enemies_in_sight = self.vision.visible_to_target(enemy_centers, player_center_x, player_center_y)
+    
+    for enemy, line_of_sight in zip(planned, enemies_in_sight):
+        self.plan_enemy(enemy, current_time, line_of_sight)
+
+def plan_enemy(self, enemy, current_time, line_of_sight):
+    """
+    Decide what an enemy does until it is next asked to think: whether it
+    retreats and where it hides, given whether it can see the player. The plan
+    is kept in the enemy's ai_threat_assessment.
+    """
+    player_center_x = self.player.x + self.player.width / 2
+    player_center_y = self.player.y + self.player.height / 2
+    enemy_center_x = enemy.x + enemy.width / 2
+    enemy_center_y = enemy.y + enemy.height / 2
+    
+    # Calculate health percentage to determine behavior
+    health_percentage = enemy.health / enemy.max_health
+    
+    # Determine behavior based on health
+    is_retreating = health_percentage < 0.5  # Retreat if below 50% health
+    
+    # Bosses are more aggressive and retreat only at lower health
+    if enemy.is_boss:
+        is_retreating = health_percentage < 0.3  # Bosses retreat only below 30% health
+    
+    best_hiding_spot = None
+    if is_retreating:
+        # Nearest tile nearby that a wall hides from the player
+        best_hiding_spot = self.cover_index.find_cover(
+            enemy_center_x, enemy_center_y, player_center_x, player_center_y
+        )
+        if best_hiding_spot:
+            enemy.last_ai_move_time = current_time
+    
+    enemy.ai_threat_assessment = {
+        "line_of_sight": line_of_sight,
+        "retreating": is_retreating,
+        "hiding_spot": best_hiding_spot
+    }
+    enemy.last_ai_threat_check = current_time
 
 def update_enemies(self):
     """Update enemy behavior and attacks"""
-    current_time = pygame.time.get_ticks()
+    current_time = self.game_clock.get_ticks()
+    enemies = self.enemies
     
-    # First pass - update direction and attack logic
-    for enemy in self.enemies:
+    # Calculate distance to player
+    distances = [
+        math.sqrt((self.player.x - enemy.x)**2 + (self.player.y - enemy.y)**2)
+        for enemy in enemies
+    ]
+    
+    # Let the enemies that are due rethink their plan. Close enemies do this
+    # every frame, far away ones only now and then (see ai_scheduler.py).
+    self.ai_scheduler.run(
+        enemies, distances, current_time,
+        lambda indices: self.plan_enemies(indices, current_time)
+    )
+    
+    # Enemies kept in columns are updated one system at a time instead
+    if isinstance(enemies, EnemyStore):
+        self.update_enemy_store(distances, current_time)
+        return
+    
+    # Timed systems: only the enemies that are hurt or still cooling down are
+    # looked at, giving the ones that heal or may not fire this frame
+    healed = set(self.regenerate_enemies(current_time))
+    not_ready, not_ready_retreating, special_not_ready = self.cooldowns.update(current_time)
+    
+    # First pass - carry out the plans: direction, attacks and movement
+    for i, (enemy, distance) in enumerate(zip(enemies, distances)):
         # Skip dead enemies
-        if enemy["health"] <= 0:
+        if enemy.health <= 0:
             continue
         
-        # Calculate health percentage to determine behavior
-        health_percentage = enemy["health"] / enemy["max_health"]
+        assessment = enemy.ai_threat_assessment
         
-        # Calculate distance to player
-        dx = self.player["x"] - enemy["x"]
-        dy = self.player["y"] - enemy["y"]
-        distance = math.sqrt(dx**2 + dy**2)
-        
-        # Get centers for calculations
-        player_center_x = self.player["x"] + self.player["width"] / 2
-        player_center_y = self.player["y"] + self.player["height"] / 2
-        enemy_center_x = enemy["x"] + enemy["width"] / 2
-        enemy_center_y = enemy["y"] + enemy["height"] / 2
+        # Show a + symbol now and then over enemies that healed noticeably
+        if enemy in healed and random.random() < 0.1:  # 10% chance per significant healing
+            self.effects.spawn(
+                FLOATING_TEXT, "+",
+                enemy.x + enemy.width / 2, enemy.y - 15,
+                (50, 255, 50),  # Green for healing
+                current_time, 800  # milliseconds
+            )
         
-        # Check if line of sight to player is clear
-        line_of_sight = True  # Assume true and then check for obstructions
-        for wall in self.walls:
-            # Check if the line from enemy to player intersects with this wall
-            if self.line_intersects_rect(
-                enemy_center_x, enemy_center_y,
-                player_center_x, player_center_y,
-                wall["x"], wall["y"], wall["width"], wall["height"]
-            ):
-                line_of_sight = False
-                break
+        # Turn, attack and pick where to move
+        new_x, new_y = self.steer_enemy(
+            enemy, distance, current_time, enemy not in not_ready,
+            enemy not in not_ready_retreating, enemy not in special_not_ready
+        )
         
-        # Health regeneration when not shooting
-        # Calculate time since last attack
-        time_since_last_attack = current_time - enemy.get("last_attack_time", 0) 
+        # Check for wall collisions
+        collision_with_wall = self.enemy_collides_with_walls(enemy, new_x, new_y)
         
-        # Only regenerate if:
-        # 1. It's been at least 2 seconds since last attack 
-        # 2. Health is below max health
-        # 3. Preferably when not in line of sight (faster regeneration when hidden)
-        if time_since_last_attack > 2000 and enemy["health"] < enemy["max_health"]:
-            # Initialize last_regen_time if it doesn't exist
-            if "last_regen_time" not in enemy:
-                enemy["last_regen_time"] = current_time - 100  # Set slightly behind for immediate small regen
-            
-            # Calculate time since last regeneration
-            time_since_last_regen = current_time - enemy.get("last_regen_time", 0)
-            
-            # Convert to seconds for the regen calculation
-            seconds_elapsed = time_since_last_regen / 1000
-            
-            # Initialize regen_rate if it doesn't exist (fallback)
-            if "regen_rate" not in enemy:
-                enemy["regen_rate"] = 0.5 if not enemy.get("is_boss", False) else 1.0
-            
-            # Calculate regeneration amount (faster when hiding)
-            regen_multiplier = 0.5 if line_of_sight else 1.0  # Regenerate faster when hidden
-            regen_amount = enemy["regen_rate"] * seconds_elapsed * regen_multiplier
+        # Only move if no collision with walls
+        if not collision_with_wall:
+            enemy.x = new_x
+            enemy.y = new_y
             
-            # Only apply regeneration if there's a meaningful amount
-            if regen_amount > 0.001:  # Ensure there's actual healing to apply
-                # Apply the health regeneration
-                old_health = enemy["health"]
-                enemy["health"] = min(enemy["max_health"], enemy["health"] + regen_amount)
-                actual_healing = enemy["health"] - old_health
-                
-                # Update last regeneration time
-                enemy["last_regen_time"] = current_time
-                
-                # Visual effect for regeneration (if significant healing occurred)
-                if actual_healing > 0.5:  # Only show for noticeable healing
-                    # Store healing indicators if not already present
-                    if not hasattr(self, 'healing_indicators'):
-                        self.healing_indicators = []
-                    
-                    # Show a heart or + symbol for healing with low chance to avoid spam
-                    if random.random() < 0.1:  # 10% chance per significant healing
-                        self.healing_indicators.append({
-                            "x": enemy["x"] + enemy["width"] / 2,
-                            "y": enemy["y"] - 15,
-                            "text": "+",
-                            "color": (50, 255, 50),  # Green for healing
-                            "time_created": current_time,
-                            "lifespan": 800  # milliseconds
-                        })
-        
-        # Determine behavior based on health
-        is_retreating = health_percentage < 0.5  # Retreat if below 50% health
+        # If enemy is at low health, occasionally add a visual indicator
+        if assessment["retreating"] and random.random() < 0.05:  # 5% chance per frame
+            # Add retreat visual indicator
+            self.effects.spawn(
+                FLOATING_TEXT, "!!",
+                enemy.x + enemy.width / 2, enemy.y - 15,
+                (255, 100, 100),
+                self.game_clock.get_ticks(), 500  # milliseconds
+            )
+    
+    # Second pass - handle enemy-to-enemy collisions and separation
+    self.separate_enemies()
+
+def steer_enemy(self, enemy, distance, current_time, attack_ready, retreat_attack_ready, special_ready):
+    """
+    Carry out an enemy's plan for this frame: turn, attack and pick where to
+    move. Returns the position the enemy wants to move to.
+    
+    The ready flags say which of the enemy's cooldowns are over (see cooldowns.py).
+    """
+    assessment = enemy.ai_threat_assessment
+    line_of_sight = assessment["line_of_sight"]
+    
+    dx = self.player.x - enemy.x
+    dy = self.player.y - enemy.y
+    
+    # Get centers for calculations
+    enemy_center_x = enemy.x + enemy.width / 2
+    enemy_center_y = enemy.y + enemy.height / 2
+    
+    # Behavior was decided in plan_enemy
+    is_retreating = assessment["retreating"]
+    
+    # If enemy is at high health or is a boss with decent health, be aggressive
+    if not is_retreating:
+        # AGGRESSIVE BEHAVIOR - Attack player
         
-        # Bosses are more aggressive and retreat only at lower health
-        if enemy.get("is_boss", False):
-            is_retreating = health_percentage < 0.3  # Bosses retreat only below 30% health
+        # Update enemy direction to face player (for aiming)
+        target_direction = math.degrees(math.atan2(dy, dx))
         
-        # If enemy is at high health or is a boss with decent health, be aggressive
-        if not is_retreating:
-            # AGGRESSIVE BEHAVIOR - Attack player
-            
-            # Update enemy direction to face player (for aiming)
-            target_direction = math.degrees(math.atan2(dy, dx))
-            
-            # Smooth rotation for more natural movement
-            angle_diff = (target_direction - enemy["direction"] + 180) % 360 - 180
-            rotation_speed = 5  # degrees per frame
-            if abs(angle_diff) > rotation_speed:
-                if angle_diff > 0:
-                    enemy["direction"] += rotation_speed
-                else:
-                    enemy["direction"] -= rotation_speed
+        # Smooth rotation for more natural movement
+        angle_diff = (target_direction - enemy.direction + 180) % 360 - 180
+        rotation_speed = 5  # degrees per frame
+        if abs(angle_diff) > rotation_speed:
+            if angle_diff > 0:
+                enemy.direction += rotation_speed
             else:
-                enemy["direction"] = target_direction
-            
-            # Keep direction in 0-360 range
-            enemy["direction"] = enemy["direction"] % 360
-            
-            # If player is within attack range and we have line of sight, shoot
-            if distance <= enemy["range"] and line_of_sight:
-                # Regular attack logic
-                time_since_last_attack = current_time - enemy["last_attack_time"]
+                enemy.direction -= rotation_speed
+        else:
+            enemy.direction = target_direction
+        
+        # Keep direction in 0-360 range
+        enemy.direction = enemy.direction % 360
+        
+        # If player is within attack range and we have line of sight, shoot
+        if distance <= enemy.range and line_of_sight:
+            # Only shoot if it's been long enough since last attack
+            if attack_ready:
+                enemy.last_attack_time = current_time
+                self.cooldowns.track(enemy)
                 
-                # Only shoot if it's been long enough since last attack
-                attack_interval = 1000 / enemy["attack_speed"]
-                if time_since_last_attack > attack_interval:
-                    enemy["last_attack_time"] = current_time
-                    
-                    # Play enemy shoot sound
-                    self.play_sound("shoot")
-                    
-                    # Calculate bullet starting position
-                    angle_rad = math.radians(enemy["direction"])
-                    bullet_x = enemy["x"] + enemy["width"] / 2 + math.cos(angle_rad) * 30
-                    bullet_y = enemy["y"] + enemy["height"] / 2 + math.sin(angle_rad) * 30
-                    
-                    # For bosses, use special attack patterns
-                    if enemy.get("is_boss", False):
-                        # Check if it's time for a special attack
-                        time_since_special = current_time - enemy.get("last_special_attack_time", 0)
+                # Play enemy shoot sound
+                self.play_sound("shoot")
+                
+                # Calculate bullet starting position
+                angle_rad = math.radians(enemy.direction)
+                bullet_x = enemy.x + enemy.width / 2 + math.cos(angle_rad) * 30
+                bullet_y = enemy.y + enemy.height / 2 + math.sin(angle_rad) * 30
+                
+                # For bosses, use special attack patterns
+                if enemy.is_boss:
+                    # Check if it's time for a special attack
+                    if special_ready:
+                        # It's time for a special attack!
+                        enemy.last_special_attack_time = current_time
                         
-                        if time_since_special > enemy["special_cooldown"]:
-                            # It's time for a special attack!
-                            enemy["last_special_attack_time"] = current_time
-                            
-                            # Different attack patterns for bosses
-                            if enemy["attack_pattern"] == "spread":
-                                # Spread shot - 5 bullets in a spread pattern
-                                for angle_offset in [-30, -15, 0, 15, 30]:
-                                    spread_angle = enemy["direction"] + angle_offset
-                                    spread_rad = math.radians(spread_angle)
-                                    spread_x = enemy["x"] + enemy["width"] / 2 + math.cos(spread_rad) * 30
-                                    spread_y = enemy["y"] + enemy["height"] / 2 + math.sin(spread_rad) * 30
-                                    
-                                    self.create_bullet(
-                                        spread_x, spread_y,
-                                        spread_angle,
-                                        enemy["damage"],
-                                        False,
-                                        enemy["color"]
-                                    )
-                            
-                            elif enemy["attack_pattern"] == "burst":
-                                # Burst fire - multiple bullets in quick succession
-                                for _ in range(3):
-                                    # Add slight random variation to each shot
-                                    burst_angle = enemy["direction"] + random.uniform(-5, 5)
-                                    burst_rad = math.radians(burst_angle)
-                                    burst_x = enemy["x"] + enemy["width"] / 2 + math.cos(burst_rad) * 30
-                                    burst_y = enemy["y"] + enemy["height"] / 2 + math.sin(burst_rad) * 30
-                                    
-                                    self.create_bullet(
-                                        burst_x, burst_y,
-                                        burst_angle,
-                                        enemy["damage"],
-                                        False,
-                                        enemy["color"]
-                                    )
-                            
-                            elif enemy["attack_pattern"] == "sniper":
-                                # Sniper shot - single powerful bullet
+                        # Different attack patterns for bosses
+                        if enemy.attack_pattern == "spread":
+                            # Spread shot - 5 bullets in a spread pattern
+                            for angle_offset in [-30, -15, 0, 15, 30]:
+                                spread_angle = enemy.direction + angle_offset
+                                spread_rad = math.radians(spread_angle)
+                                spread_x = enemy.x + enemy.width / 2 + math.cos(spread_rad) * 30
+                                spread_y = enemy.y + enemy.height / 2 + math.sin(spread_rad) * 30
+                                
                                 self.create_bullet(
-                                    bullet_x, bullet_y,
-                                    enemy["direction"],
-                                    enemy["damage"] * 2,  # Double damage
+                                    spread_x, spread_y,
+                                    spread_angle,
+                                    enemy.damage,
                                     False,
-                                    (255, 255, 0)  # Yellow bullet for sniper shot
+                                    enemy.color
                                 )
-                        else:
-                            # Regular attack for bosses between special attacks
+                        
+                        elif enemy.attack_pattern == "burst":
+                            # Burst fire - multiple bullets in quick succession. The
+                            # first goes now, timers on the game clock fire the rest.
+                            self.fire_burst_shot(enemy)
+                            enemy.pending_shots = [
+                                self.game_clock.schedule(
+                                    shot * BOSS_BURST_INTERVAL, self.fire_burst_shot, enemy
+                                )
+                                for shot in range(1, BOSS_BURST_SHOTS)
+                            ]
+                        
+                        elif enemy.attack_pattern == "sniper":
+                            # Sniper shot - single powerful bullet
                             self.create_bullet(
                                 bullet_x, bullet_y,
-                                enemy["direction"],
-                                enemy["damage"],
+                                enemy.direction,
+                                enemy.damage * 2,  # Double damage
                                 False,
-                                enemy["color"]
+                                (255, 255, 0)  # Yellow bullet for sniper shot
                             )
                     else:
-                        # Regular enemy - just create a single bullet
+                        # Regular attack for bosses between special attacks
                         self.create_bullet(
                             bullet_x, bullet_y,
-                            enemy["direction"],
-                            enemy["damage"],
+                            enemy.direction,
+                            enemy.damage,
                             False,
-                            enemy["color"]
+                            enemy.color
                         )
+                else:
+                    # Regular enemy - just create a single bullet
+                    self.create_bullet(
+                        bullet_x, bullet_y,
+                        enemy.direction,
+                        enemy.damage,
+                        False,
+                        enemy.color
+                    )
+        
+        # Move towards player with smart positioning
+        # Calculate movement vector towards player
+        angle_rad = math.radians(enemy.direction)
+        move_speed = enemy.speed
+        
+        # Determine optimal shooting distance based on enemy type
+        optimal_distance = enemy.range * 0.7  # Stay at 70% of maximum range
+        
+        # For bosses, maintain even more distance to make them harder to hit
+        if enemy.is_boss:
+            optimal_distance = enemy.range * 0.8  # Stay at 80% of max range for bosses
+        
+        # Adjust movement based on current distance to player
+        if distance > optimal_distance + 20:  # Too far, move closer
+            # Move toward player
+            new_x = enemy.x + math.cos(angle_rad) * move_speed
+            new_y = enemy.y + math.sin(angle_rad) * move_speed
+        elif distance < optimal_distance - 20:  # Too close, back away
+            # Move away from player
+            retreat_angle_rad = math.radians((enemy.direction + 180) % 360)
+            new_x = enemy.x + math.cos(retreat_angle_rad) * (move_speed * 0.7)  # Move away slower
+            new_y = enemy.y + math.sin(retreat_angle_rad) * (move_speed * 0.7)
+        else:
+            # At good shooting distance, strafe sideways to make harder target
+            strafe_direction = 1 if random.random() < 0.5 else -1  # Randomly go left or right
+            strafe_angle_rad = math.radians((enemy.direction + strafe_direction * 90) % 360)
             
-            # Move towards player with smart positioning
-            # Calculate movement vector towards player
-            angle_rad = math.radians(enemy["direction"])
-            move_speed = enemy["speed"]
-            
-            # Determine optimal shooting distance based on enemy type
-            optimal_distance = enemy["range"] * 0.7  # Stay at 70% of maximum range
+            # If enemy has an ID, use it to make strafing more consistent
+            if enemy.id is not None:
+                # Use ID to determine strafe direction (even IDs go right, odd go left)
+                strafe_direction = 1 if enemy.id % 2 == 0 else -1
+                strafe_angle_rad = math.radians((enemy.direction + strafe_direction * 90) % 360)
             
-            # For bosses, maintain even more distance to make them harder to hit
-            if enemy.get("is_boss", False):
-                optimal_distance = enemy["range"] * 0.8  # Stay at 80% of max range for bosses
+            # Strafe at reduced speed
+            new_x = enemy.x + math.cos(strafe_angle_rad) * (move_speed * 0.5)
+            new_y = enemy.y + math.sin(strafe_angle_rad) * (move_speed * 0.5)
             
-            # Adjust movement based on current distance to player
-            if distance > optimal_distance + 20:  # Too far, move closer
-                # Move toward player
-                new_x = enemy["x"] + math.cos(angle_rad) * move_speed
-                new_y = enemy["y"] + math.sin(angle_rad) * move_speed
-            elif distance < optimal_distance - 20:  # Too close, back away
-                # Move away from player
-                retreat_angle_rad = math.radians((enemy["direction"] + 180) % 360)
-                new_x = enemy["x"] + math.cos(retreat_angle_rad) * (move_speed * 0.7)  # Move away slower
-                new_y = enemy["y"] + math.sin(retreat_angle_rad) * (move_speed * 0.7)
-            else:
-                # At good shooting distance, strafe sideways to make harder target
-                strafe_direction = 1 if random.random() < 0.5 else -1  # Randomly go left or right
-                strafe_angle_rad = math.radians((enemy["direction"] + strafe_direction * 90) % 360)
-                
-                # If enemy has an ID, use it to make strafing more consistent
-                if "id" in enemy:
-                    # Use ID to determine strafe direction (even IDs go right, odd go left)
-                    strafe_direction = 1 if enemy["id"] % 2 == 0 else -1
-                    strafe_angle_rad = math.radians((enemy["direction"] + strafe_direction * 90) % 360)
+            # Occasionally stop to aim better (10% chance while at optimal range)
+            if random.random() < 0.1:
+                new_x = enemy.x
+                new_y = enemy.y
                 
-                # Strafe at reduced speed
-                new_x = enemy["x"] + math.cos(strafe_angle_rad) * (move_speed * 0.5)
-                new_y = enemy["y"] + math.sin(strafe_angle_rad) * (move_speed * 0.5)
-                
-                # Occasionally stop to aim better (10% chance while at optimal range)
-                if random.random() < 0.1:
-                    new_x = enemy["x"]
-                    new_y = enemy["y"]
-                    
-        else:
-            # RETREAT BEHAVIOR - Run away and find cover
+    else:
+        # RETREAT BEHAVIOR - Run away and find cover
+        
+        # Cover was picked in plan_enemy
+        best_hiding_spot = assessment["hiding_spot"]
+        
+        # If we found a suitable tile to hide on
+        if best_hiding_spot:
+            # Calculate direction towards hiding spot
+            hide_dx = best_hiding_spot[0] - enemy_center_x
+            hide_dy = best_hiding_spot[1] - enemy_center_y
+            retreat_direction = math.degrees(math.atan2(hide_dy, hide_dx))
             
-            # Initialize variables to find the best retreat direction
-            best_hiding_spot = None
-            best_hiding_distance = float('inf')
+            # Set enemy direction to face the hiding spot
+            enemy.direction = retreat_direction
             
-            # Try to find a wall to hide behind
-            for wall in self.walls:
-                wall_center_x = wall["x"] + wall["width"] / 2
-                wall_center_y = wall["y"] + wall["height"] / 2
-                
-                # Calculate vector from player to wall center
-                player_to_wall_x = wall_center_x - player_center_x
-                player_to_wall_y = wall_center_y - player_center_y
-                player_to_wall_dist = math.sqrt(player_to_wall_x**2 + player_to_wall_y**2)
-                
-                # Calculate vector from enemy to wall center
-                enemy_to_wall_x = wall_center_x - enemy_center_x
-                enemy_to_wall_y = wall_center_y - enemy_center_y
-                enemy_to_wall_dist = math.sqrt(enemy_to_wall_x**2 + enemy_to_wall_y**2)
-                
-                # Only consider walls that are:
-                # 1. Relatively far from player
-                # 2. Can provide cover (break line of sight)
-                # 3. Not too far from the enemy
-                if (player_to_wall_dist > 200 and  # Wall is far from player
-                    enemy_to_wall_dist < 300 and   # Wall is not too far from enemy
-                    not line_of_sight):            # Wall can provide cover
-                    
-                    # Check if this wall is better than previously found walls
-                    if enemy_to_wall_dist < best_hiding_distance:
-                        best_hiding_spot = (wall_center_x, wall_center_y)
-                        best_hiding_distance = enemy_to_wall_dist
+            # Calculate movement with a boost to retreat speed
+            retreat_speed_multiplier = 1.2  # Retreat 20% faster than normal
+            angle_rad = math.radians(retreat_direction)
+            move_speed = enemy.speed * retreat_speed_multiplier
             
-            # If we found a suitable wall to hide behind
-            if best_hiding_spot:
-                # Calculate direction towards hiding spot
-                hide_dx = best_hiding_spot[0] - enemy_center_x
-                hide_dy = best_hiding_spot[1] - enemy_center_y
-                retreat_direction = math.degrees(math.atan2(hide_dy, hide_dx))
-                
-                # Set enemy direction to face the hiding spot
-                enemy["direction"] = retreat_direction
-                
-                # Calculate movement with a boost to retreat speed
-                retreat_speed_multiplier = 1.2  # Retreat 20% faster than normal
-                angle_rad = math.radians(retreat_direction)
-                move_speed = enemy["speed"] * retreat_speed_multiplier
-                new_x = enemy["x"] + math.cos(angle_rad) * move_speed
-                new_y = enemy["y"] + math.sin(angle_rad) * move_speed
-                
-            else:
-                # No good hiding spot found, just run away from player
-                retreat_direction = (math.degrees(math.atan2(dy, dx)) + 180) % 360
-                
-                # Set enemy direction away from player
-                enemy["direction"] = retreat_direction
-                
-                # Retreat movement with speed boost
-                retreat_speed_multiplier = 1.2  # Retreat 20% faster than normal
-                angle_rad = math.radians(retreat_direction)
-                move_speed = enemy["speed"] * retreat_speed_multiplier
-                new_x = enemy["x"] + math.cos(angle_rad) * move_speed
-                new_y = enemy["y"] + math.sin(angle_rad) * move_speed
+            # Stop on the spot instead of overshooting it
+            move_speed = min(move_speed, math.sqrt(hide_dx**2 + hide_dy**2))
+            new_x = enemy.x + math.cos(angle_rad) * move_speed
+            new_y = enemy.y + math.sin(angle_rad) * move_speed
             
-            # Every so often, shoot back while retreating (if we have line of sight)
-            if line_of_sight and random.random() < 0.1 and distance <= enemy["range"]:  # 10% chance to fire while retreating
-                current_time = pygame.time.get_ticks()
-                time_since_last_attack = current_time - enemy["last_attack_time"]
-                
-                # Only shoot if it's been long enough since last attack
-                attack_interval = 1000 / enemy["attack_speed"]
-                if time_since_last_attack > attack_interval * 1.5:  # Slower attack rate while retreating
-                    # Temporarily face player to shoot
-                    original_direction = enemy["direction"]
-                    enemy["direction"] = math.degrees(math.atan2(dy, dx))
-                    
-                    # Play enemy shoot sound
-                    self.play_sound("shoot")
-                    
-                    # Calculate bullet starting position
-                    shoot_angle_rad = math.radians(enemy["direction"])
-                    bullet_x = enemy["x"] + enemy["width"] / 2 + math.cos(shoot_angle_rad) * 30
-                    bullet_y = enemy["y"] + enemy["height"] / 2 + math.sin(shoot_angle_rad) * 30
-                    
-                    # Create bullet (basic attack only while retreating)
-                    self.create_bullet(
-                        bullet_x, bullet_y,
-                        enemy["direction"],
-                        enemy["damage"] * 0.7,  # Reduced damage while retreating
-                        False,
-                        enemy["color"]
-                    )
-                    
-                    # Reset direction back to retreat direction
-                    enemy["direction"] = original_direction
-                    enemy["last_attack_time"] = current_time
+        else:
+            # No good hiding spot found, just run away from player
+            retreat_direction = (math.degrees(math.atan2(dy, dx)) + 180) % 360
             
-        # Check for wall collisions
-        collision_with_wall = False
-        for wall in self.walls:
-            if "collision_width" in enemy:
-                if (new_x + enemy["collision_offset_x"] < wall["x"] + wall["width"] and
-                    new_x + enemy["collision_offset_x"] + enemy["collision_width"] > wall["x"] and
-                    new_y + enemy["collision_offset_y"] < wall["y"] + wall["height"] and
-                    new_y + enemy["collision_offset_y"] + enemy["collision_height"] > wall["y"]):
-                    collision_with_wall = True
-                    break
-            else:
-                if (new_x < wall["x"] + wall["width"] and
-                    new_x + enemy["width"] > wall["x"] and
-                    new_y < wall["y"] + wall["height"] and
-                    new_y + enemy["height"] > wall["y"]):
-                    collision_with_wall = True
-                    break
-        
-        # Only move if no collision with walls
-        if not collision_with_wall:
-            enemy["x"] = new_x
-            enemy["y"] = new_y
+            # Set enemy direction away from player
+            enemy.direction = retreat_direction
             
-        # If enemy is at low health, occasionally add a visual indicator
-        if is_retreating and random.random() < 0.05:  # 5% chance per frame
-            # Store retreat indicators if not already present
-            if not hasattr(self, 'retreat_indicators'):
-                self.retreat_indicators = []
+            # Retreat movement with speed boost
+            retreat_speed_multiplier = 1.2  # Retreat 20% faster than normal
+            angle_rad = math.radians(retreat_direction)
+            move_speed = enemy.speed * retreat_speed_multiplier
+            new_x = enemy.x + math.cos(angle_rad) * move_speed
+            new_y = enemy.y + math.sin(angle_rad) * move_speed
+        
+        # Every so often, shoot back while retreating (if we have line of sight)
+        if line_of_sight and random.random() < 0.1 and distance <= enemy.range:  # 10% chance to fire while retreating
+            # Only shoot if it's been long enough since last attack
+            if retreat_attack_ready:  # Slower attack rate while retreating
+                # Temporarily face player to shoot
+                original_direction = enemy.direction
+                enemy.direction = math.degrees(math.atan2(dy, dx))
+                
+                # Play enemy shoot sound
+                self.play_sound("shoot")
+                
+                # Calculate bullet starting position
+                shoot_angle_rad = math.radians(enemy.direction)
+                bullet_x = enemy.x + enemy.width / 2 + math.cos(shoot_angle_rad) * 30
+                bullet_y = enemy.y + enemy.height / 2 + math.sin(shoot_angle_rad) * 30
                 
-            # Add retreat visual indicator (e.g., "!!" or "Retreating!")
-            self.retreat_indicators.append({
-                "x": enemy["x"] + enemy["width"] / 2,
-                "y": enemy["y"] - 15,
-                "text": "!!",
-                "color": (255, 100, 100),
-                "time_created": pygame.time.get_ticks(),
-                "lifespan": 500  # milliseconds
-            })
+                # Create bullet (basic attack only while retreating)
+                self.create_bullet(
+                    bullet_x, bullet_y,
+                    enemy.direction,
+                    enemy.damage * 0.7,  # Reduced damage while retreating
+                    False,
+                    enemy.color
+                )
+                
+                # Reset direction back to retreat direction
+                enemy.direction = original_direction
+                enemy.last_attack_time = current_time
+                self.cooldowns.track(enemy)
     
-    # Second pass - handle enemy-to-enemy collisions and separation
-    for i, enemy1 in enumerate(self.enemies):
+    return new_x, new_y
+
+def fire_burst_shot(self, enemy):
+    """Fire one bullet of a burst where the enemy is facing, with slight random variation"""
+    burst_angle = enemy.direction + random.uniform(-5, 5)
+    burst_rad = math.radians(burst_angle)
+    burst_x = enemy.x + enemy.width / 2 + math.cos(burst_rad) * 30
+    burst_y = enemy.y + enemy.height / 2 + math.sin(burst_rad) * 30
+    
+    self.create_bullet(
+        burst_x, burst_y,
+        burst_angle,
+        enemy.damage,
+        False,
+        enemy.color
+    )
+
+def separate_enemies(self):
+    """Push overlapping enemies apart without moving them into walls"""
+    enemies = self.enemies
+    count = len(enemies)
+    
+    # With only a few enemies checking every pair is cheapest. With more we
+    # bucket enemy centers in a grid and only check the neighbouring cells,
+    # so the cost grows with the number of enemies instead of its square.
+    use_grid = count > SEPARATION_GRID_THRESHOLD
+    if use_grid:
+        # No two enemies further apart than the widest one can overlap
+        reach = max(enemy.collision_width or enemy.width for enemy in enemies)
+        neighbor_hash = SpatialHash(reach)
+        for j, enemy in enumerate(enemies):
+            if enemy.health > 0:
+                neighbor_hash.insert(
+                    j, enemy.x + enemy.width / 2, enemy.y + enemy.height / 2, 0, 0
+                )
+    
+    for i, enemy1 in enumerate(enemies):
         # Skip dead enemies
-        if enemy1["health"] <= 0:
+        if enemy1.health <= 0:
             continue
             
         # Store total repulsion forces for this enemy
@@ -963,28 +997,35 @@ def update_enemies(self):
         repulsion_y = 0
         collisions_detected = 0
         
-        # Check collisions with all other enemies
-        for j, enemy2 in enumerate(self.enemies):
+        enemy1_center_x = enemy1.x + enemy1.width / 2
+        enemy1_center_y = enemy1.y + enemy1.height / 2
+        enemy1_width = enemy1.collision_width or enemy1.width
+        
+        # Pick the enemies that could be touching this one
+        if use_grid:
+            neighbors = sorted(neighbor_hash.query(
+                enemy1_center_x - reach, enemy1_center_y - reach, reach * 2, reach * 2
+            ))
+        else:
+            neighbors = range(count)
+        
+        # Check collisions with the other enemies
+        for j in neighbors:
+            enemy2 = enemies[j]
             # Skip if same enemy or if enemy2 is dead
-            if i == j or enemy2["health"] <= 0:
+            if i == j or enemy2.health <= 0:
                 continue
                 
-            # Calculate centers
-            enemy1_center_x = enemy1["x"] + enemy1["width"] / 2
-            enemy1_center_y = enemy1["y"] + enemy1["height"] / 2
-            enemy2_center_x = enemy2["x"] + enemy2["width"] / 2
-            enemy2_center_y = enemy2["y"] + enemy2["height"] / 2
-            
-            # Calculate distance between centers
+            # Calculate distance between centers (positions may have changed
+            # earlier in this pass, so always read them from the enemy)
+            enemy2_center_x = enemy2.x + enemy2.width / 2
+            enemy2_center_y = enemy2.y + enemy2.height / 2
             dx = enemy1_center_x - enemy2_center_x
             dy = enemy1_center_y - enemy2_center_y
             distance = math.sqrt(dx**2 + dy**2)
             
             # Calculate minimum distance needed to prevent overlap
-            if "collision_width" in enemy1:
-                min_distance = (enemy1["collision_width"] + enemy2.get("collision_width", enemy2["width"])) / 2
-            else:
-                min_distance = (enemy1["width"] + enemy2.get("collision_width", enemy2["width"])) / 2
+            min_distance = (enemy1_width + (enemy2.collision_width or enemy2.width)) / 2
             
             # If overlapping
             if distance < min_distance:
@@ -1010,70 +1051,224 @@ def update_enemies(self):
         # Apply combined repulsion forces if any collisions were detected
         if collisions_detected > 0:
             # Apply a slightly larger force for bosses (they're more forceful)
-            force_multiplier = 1.5 if enemy1.get("is_boss", False) else 1.0
+            force_multiplier = 1.5 if enemy1.is_boss else 1.0
             
             # Add repulsion to position (with collision check for walls)
-            new_x = enemy1["x"] + repulsion_x * force_multiplier
-            new_y = enemy1["y"] + repulsion_y * force_multiplier
+            new_x = enemy1.x + repulsion_x * force_multiplier
+            new_y = enemy1.y + repulsion_y * force_multiplier
             
             # Check wall collisions for the repulsion movement
-            wall_collision = False
-            for wall in self.walls:
-                if "collision_width" in enemy1:
-                    if (new_x + enemy1["collision_offset_x"] < wall["x"] + wall["width"] and
-                        new_x + enemy1["collision_offset_x"] + enemy1["collision_width"] > wall["x"] and
-                        new_y + enemy1["collision_offset_y"] < wall["y"] + wall["height"] and
-                        new_y + enemy1["collision_offset_y"] + enemy1["collision_height"] > wall["y"]):
-                        wall_collision = True
-                        break
-                else:
-                    if (new_x < wall["x"] + wall["width"] and
-                        new_x + enemy1["width"] > wall["x"] and
-                        new_y < wall["y"] + wall["height"] and
-                        new_y + enemy1["height"] > wall["y"]):
-                        wall_collision = True
-                        break
+            wall_collision = self.enemy_collides_with_walls(enemy1, new_x, new_y)
             
             # Only apply repulsion if it doesn't cause a wall collision
             if not wall_collision:
-                enemy1["x"] = new_x
-                enemy1["y"] = new_y
+                enemy1.x = new_x
+                enemy1.y = new_y
+                
+                # Also file the enemy under its new position. The old entry
+                # just turns up as an extra candidate that fails the distance test.
+                if use_grid:
+                    neighbor_hash.insert(
+                        i, new_x + enemy1.width / 2, new_y + enemy1.height / 2, 0, 0
+                    )
 
-def line_intersects_rect(self, x1, y1, x2, y2, rx, ry, rw, rh):
-    """Check if line from (x1,y1) to (x2,y2) intersects with rectangle (rx,ry,rw,rh)"""
-    # Convert rectangle to its four line segments
-    lines = [
-        (rx, ry, rx + rw, ry),         # Top
-        (rx, ry + rh, rx + rw, ry + rh), # Bottom
-        (rx, ry, rx, ry + rh),         # Left
-        (rx + rw, ry, rx + rw, ry + rh)  # Right
-    ]
+def update_enemy_store(self, distances, current_time):
+    """update_enemies for enemies kept in an EnemyStore, one system at a time"""
+    store = self.enemies
+    rows = store.rows
+    xs, ys = store.x, store.y
+    healths = store.health
     
-    # Check if the line intersects with any of the rectangle's sides
-    for lx1, ly1, lx2, ly2 in lines:
-        if self.line_intersection(x1, y1, x2, y2, lx1, ly1, lx2, ly2):
-            return True
+    # Regen system - a few of the enemies that healed noticeably show a "+"
+    for i in sorted(row.index for row in self.regenerate_enemies(current_time)):
+        if random.random() < 0.1:
+            self.effects.spawn(
+                FLOATING_TEXT, "+", xs[i] + store.width[i] / 2, ys[i] - 15,
+                (50, 255, 50), current_time, 800
+            )
     
-    # Also check if either endpoint is inside the rectangle
-    if (rx <= x1 <= rx + rw and ry <= y1 <= ry + rh) or (rx <= x2 <= rx + rw and ry <= y2 <= ry + rh):
-        return True
-        
-    return False
+    # Cooldown system
+    not_ready, not_ready_retreating, special_not_ready = self.cooldowns.update(current_time)
+    
+    # Every living enemy carries out its plan and says which step it wants to take
+    vxs, vys = store.vx, store.vy
+    for i, distance in enumerate(distances):
+        if healths[i] <= 0:
+            vxs[i] = vys[i] = 0.0
+            continue
+        row = rows[i]
+        new_x, new_y = self.steer_enemy(
+            row, distance, current_time, row not in not_ready,
+            row not in not_ready_retreating, row not in special_not_ready
+        )
+        vxs[i] = new_x - xs[i]
+        vys[i] = new_y - ys[i]
+    
+    # Movement system
+    self.move_enemy_columns()
+    
+    # Retreating enemies now and then show a "!!"
+    for i, row in enumerate(rows):
+        if healths[i] > 0 and row.enemy.ai_threat_assessment["retreating"] and random.random() < 0.05:
+            self.effects.spawn(
+                FLOATING_TEXT, "!!", xs[i] + store.width[i] / 2, ys[i] - 15,
+                (255, 100, 100), current_time, 500
+            )
+    
+    # Separation system
+    self.separate_enemy_columns()
 
-def line_intersection(self, x1, y1, x2, y2, x3, y3, x4, y4):
-    """Check if two line segments intersect"""
-    # Calculate determinants
-    den = (y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1)
+def regenerate_enemies(self, current_time):
+    """
+    Regen system: heal every living enemy that is hurt and hasn't attacked for
+    2 seconds, faster when hidden from the player.
     
-    # Lines are parallel if den is zero
-    if den == 0:
-        return False
+    Only the hurt enemies are looked at (see cooldowns.py), so a frame where
+    nobody is hurt does no work. Returns the enemies that healed by more than
+    half a point.
+    """
+    hurt = self.cooldowns.hurt
+    healed = []
+    for enemy in list(hurt):
+        if current_time - enemy.last_attack_time <= 2000:
+            continue
+        
+        # Convert to seconds for the regen calculation
+        seconds_elapsed = (current_time - enemy.last_regen_time) / 1000
         
-    ua = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / den
-    ub = ((x2 - x1) * (y1 - y3) - (y2 - y1) * (x1 - x3)) / den
+        # Calculate regeneration amount (faster when hiding)
+        regen_multiplier = 0.5 if enemy.ai_threat_assessment["line_of_sight"] else 1.0
+        regen_amount = enemy.regen_rate * seconds_elapsed * regen_multiplier
+        
+        # Only apply regeneration if there's a meaningful amount
+        if regen_amount > 0.001:
+            old_health = enemy.health
+            enemy.health = min(enemy.max_health, enemy.health + regen_amount)
+            enemy.last_regen_time = current_time
+            if enemy.health - old_health > 0.5:  # Only noticeable healing gets a "+"
+                healed.append(enemy)
+            if enemy.health >= enemy.max_health:
+                hurt.discard(enemy)
+    return healed
+
+def move_enemy_columns(self):
+    """Take each enemy's step (vx, vy) unless it would end up in a wall"""
+    store = self.enemies
+    xs, ys, vxs, vys = store.x, store.y, store.vx, store.vy
+    
+    for i in range(len(xs)):
+        if vxs[i] == 0 and vys[i] == 0:
+            continue
+        new_x = xs[i] + vxs[i]
+        new_y = ys[i] + vys[i]
+        if not self.stored_enemy_collides_with_walls(i, new_x, new_y):
+            xs[i] = new_x
+            ys[i] = new_y
+
+def separate_enemy_columns(self):
+    """
+    Push overlapping enemies in an EnemyStore apart without moving them into walls.
+
+    Unlike separate_enemies, every push is worked out from where the enemies
+    stood at the start and then applied together. That lets each touching
+    pair be found once, from a single pass over grid cells, and pushed both ways.
+    """
+    store = self.enemies
+    xs, ys = store.x, store.y
+    widths, heights = store.width, store.height
+    healths = store.health
+    is_boss = store.is_boss
+    box_widths = store.collision_width
+    count = len(xs)
+    if count == 0:
+        return
+    
+    # Widths used for overlapping (the collision box if there is one)
+    reaches = [box_widths[i] or widths[i] for i in range(count)]
+    centers_x = [xs[i] + widths[i] / 2 for i in range(count)]
+    centers_y = [ys[i] + heights[i] / 2 for i in range(count)]
+    
+    # Bucket living enemies by center in cells as big as the widest enemy,
+    # so touching enemies are always in the same or neighbouring cells
+    reach = max(reaches)
+    cells = {}
+    for i in range(count):
+        if healths[i] > 0:
+            cell = (int(centers_x[i] // reach), int(centers_y[i] // reach))
+            members = cells.get(cell)
+            if members is None:
+                cells[cell] = [i]
+            else:
+                members.append(i)
+    
+    push_x = [0.0] * count
+    push_y = [0.0] * count
+    pushed = [False] * count
+    for (cell_x, cell_y), members in cells.items():
+        # Pairs inside the cell, then with the four neighbours after it (the
+        # other four see this cell from their side)
+        for neighbor in (None, (cell_x + 1, cell_y - 1), (cell_x + 1, cell_y),
+                         (cell_x + 1, cell_y + 1), (cell_x, cell_y + 1)):
+            if neighbor is not None:
+                others = cells.get(neighbor)
+                if not others:
+                    continue
+            for position, i in enumerate(members):
+                for j in (members[position + 1:] if neighbor is None else others):
+                    dx = centers_x[i] - centers_x[j]
+                    dy = centers_y[i] - centers_y[j]
+                    distance = math.sqrt(dx**2 + dy**2)
+                    min_distance = (reaches[i] + reaches[j]) / 2
+                    if distance >= min_distance:
+                        continue
+                    if distance > 0:
+                        dx = dx / distance
+                        dy = dy / distance
+                    else:
+                        # Directly on top of each other - pick a random direction
+                        angle = random.uniform(0, 2 * math.pi)
+                        dx = math.cos(angle)
+                        dy = math.sin(angle)
+                    repulsion_force = (min_distance - distance) * 0.5
+                    push_x[i] += dx * repulsion_force
+                    push_y[i] += dy * repulsion_force
+                    push_x[j] -= dx * repulsion_force
+                    push_y[j] -= dy * repulsion_force
+                    pushed[i] = pushed[j] = True
     
-    # Return true if line segments intersect
-    return 0 <= ua <= 1 and 0 <= ub <= 1
+    # Apply the pushes (bosses push harder) unless they end in a wall
+    for i in range(count):
+        if not pushed[i]:
+            continue
+        force_multiplier = 1.5 if is_boss[i] else 1.0
+        new_x = xs[i] + push_x[i] * force_multiplier
+        new_y = ys[i] + push_y[i] * force_multiplier
+        if not self.stored_enemy_collides_with_walls(i, new_x, new_y):
+            xs[i] = new_x
+            ys[i] = new_y
+
+def enemy_collides_with_walls(self, enemy, new_x, new_y):
+    """Check if an enemy moved to (new_x, new_y) would overlap a wall"""
+    if enemy.collision_width is not None:
+        return self.wall_grid.rect_overlaps_wall(
+            new_x + enemy.collision_offset_x,
+            new_y + enemy.collision_offset_y,
+            enemy.collision_width,
+            enemy.collision_height
+        )
+    return self.wall_grid.rect_overlaps_wall(new_x, new_y, enemy.width, enemy.height)
+
+def stored_enemy_collides_with_walls(self, i, new_x, new_y):
+    """enemy_collides_with_walls for enemy number i of an EnemyStore"""
+    store = self.enemies
+    if store.collision_width[i] is not None:
+        return self.wall_grid.rect_overlaps_wall(
+            new_x + store.collision_offset_x[i],
+            new_y + store.collision_offset_y[i],
+            store.collision_width[i],
+            store.collision_height[i]
+        )
+    return self.wall_grid.rect_overlaps_wall(new_x, new_y, store.width[i], store.height[i])
 
 def update_player_health_regeneration(self):
     """Regenerate player health when not shooting"""
@@ -1081,34 +1276,26 @@ def update_player_health_regeneration(self):
     if self.player is None:
         return
         
-    current_time = pygame.time.get_ticks()
+    current_time = self.game_clock.get_ticks()
     
     # We use the player's last_attack_time to determine if player is shooting
     # If the player shot recently, don't regenerate health
-    if "last_attack_time" in self.player:
-        time_since_last_shot = current_time - self.player["last_attack_time"]
+    time_since_last_shot = current_time - self.player.last_attack_time
+    
+    # Only start regenerating if player hasn't shot for at least 1 second
+    if time_since_last_shot >= 1000:
+        # Calculate time since last regeneration
+        time_since_last_regen = current_time - self.player.last_regen_time
         
-        # Only start regenerating if player hasn't shot for at least 1 second
-        if time_since_last_shot >= 1000:
-            # Initialize regen timer if it doesn't exist
-            if 'last_regen_time' not in self.player:
-                self.player['last_regen_time'] = current_time
+        # Only regenerate health every 1000ms (1 second)
+        if time_since_last_regen >= 1000:
+            self.player.last_regen_time = current_time
             
-            # Calculate time since last regeneration
-            time_since_last_regen = current_time - self.player['last_regen_time']
-            
-            # Only regenerate health every 1000ms (1 second)
-            if time_since_last_regen >= 1000:
-                self.player['last_regen_time'] = current_time
-                
-                # Only regenerate if health is below max
-                if self.player['health'] < self.player['max_health']:
-                    # Regenerate 5% of max health per second
-                    regen_amount = max(1, int(self.player['max_health'] * 0.05))
-                    self.player['health'] = min(self.player['max_health'], self.player['health'] + regen_amount)
-    else:
-        # If last_attack_time doesn't exist yet, initialize it
-        self.player["last_attack_time"] = current_time
+            # Only regenerate if health is below max
+            if self.player.health < self.player.max_health:
+                # Regenerate 5% of max health per second
+                regen_amount = max(1, int(self.player.max_health * 0.05))
+                self.player.health = min(self.player.max_health, self.player.health + regen_amount)
 
 def update_player_aim(self):
     """Update player direction to aim at the closest enemy"""
@@ -1119,12 +1306,12 @@ def update_player_aim(self):
     closest_enemy = None
     closest_distance = float('inf')
     
-    player_center_x = self.player["x"] + self.player["width"] / 2
-    player_center_y = self.player["y"] + self.player["height"] / 2
+    player_center_x = self.player.x + self.player.width / 2
+    player_center_y = self.player.y + self.player.height / 2
     
     for enemy in self.enemies:
-        enemy_center_x = enemy["x"] + enemy["width"] / 2
-        enemy_center_y = enemy["y"] + enemy["height"] / 2
+        enemy_center_x = enemy.x + enemy.width / 2
+        enemy_center_y = enemy.y + enemy.height / 2
         
         dx = enemy_center_x - player_center_x
         dy = enemy_center_y - player_center_y
@@ -1136,14 +1323,14 @@ def update_player_aim(self):
     
     # Update player direction to aim at the closest enemy
     if closest_enemy:
-        enemy_center_x = closest_enemy["x"] + closest_enemy["width"] / 2
-        enemy_center_y = closest_enemy["y"] + closest_enemy["height"] / 2
+        enemy_center_x = closest_enemy.x + closest_enemy.width / 2
+        enemy_center_y = closest_enemy.y + closest_enemy.height / 2
         
         dx = enemy_center_x - player_center_x
         dy = enemy_center_y - player_center_y
         
         # Calculate angle in degrees (0 = right, 90 = down, 180 = left, 270 = up)
-        self.player["direction"] = math.degrees(math.atan2(dy, dx))
+        self.player.direction = math.degrees(math.atan2(dy, dx))
 
 # Register all functions to the PyBrawl class
 def setup(PyBrawl):
@@ -1152,6 +1339,9 @@ def setup(PyBrawl):
     PyBrawl.generate_map = generate_map
     PyBrawl.add_bushes = add_bushes  # New function
     PyBrawl.is_map_fully_connected = is_map_fully_connected  # New function
+    PyBrawl.build_wall_grid = build_wall_grid
+    PyBrawl.prepare_visibility = prepare_visibility
+    PyBrawl.build_cover_index = build_cover_index
     PyBrawl.spawn_enemies = spawn_enemies
     PyBrawl.create_bullet = create_bullet
     
@@ -1159,12 +1349,21 @@ def setup(PyBrawl):
     PyBrawl.update_gameplay = update_gameplay
     PyBrawl.update_bullets = update_bullets
     PyBrawl.update_enemies = update_enemies
+    PyBrawl.plan_enemies = plan_enemies
+    PyBrawl.plan_enemy = plan_enemy
+    PyBrawl.steer_enemy = steer_enemy
+    PyBrawl.fire_burst_shot = fire_burst_shot
+    PyBrawl.separate_enemies = separate_enemies
+    PyBrawl.update_enemy_store = update_enemy_store
+    PyBrawl.regenerate_enemies = regenerate_enemies
+    PyBrawl.move_enemy_columns = move_enemy_columns
+    PyBrawl.separate_enemy_columns = separate_enemy_columns
     PyBrawl.update_player_health_regeneration = update_player_health_regeneration
     PyBrawl.update_player_aim = update_player_aim
     
-    # Add line intersection utility methods for improved enemy AI
-    PyBrawl.line_intersects_rect = line_intersects_rect
-    PyBrawl.line_intersection = line_intersection
+    # Add wall collision checks for enemies
+    PyBrawl.enemy_collides_with_walls = enemy_collides_with_walls
+    PyBrawl.stored_enemy_collides_with_walls = stored_enemy_collides_with_walls
     
     # Add spawn_boss as a standalone function
     PyBrawl.spawn_boss = spawn_boss
@@ -4,6 +4,17 @@ import math
 from game_engine import GameState, SCREEN_WIDTH, SCREEN_HEIGHT
 import random
 
+def get_mouse_pos(self):
+    """Mouse position on the surface the game draws on (self.screen)"""
+    mouse_x, mouse_y = pygame.mouse.get_pos()
+    
+    # A logical surface is shown scaled into the letterbox, so undo that
+    if self.screen is not self.display:
+        mouse_x = (mouse_x - self.display_x_offset) / self.display_scale
+        mouse_y = (mouse_y - self.display_y_offset) / self.display_scale
+    
+    return mouse_x, mouse_y
+
 def handle_title_screen_input(self):
     """Handle input on the title screen"""
     for event in pygame.event.get():
@@ -20,7 +31,7 @@ def handle_title_screen_input(self):
                 sys.exit()
         elif event.type == pygame.MOUSEBUTTONDOWN:
             # Get mouse position
-            mouse_x, mouse_y = pygame.mouse.get_pos()
+            mouse_x, mouse_y = self.get_mouse_pos()
             
             # If in fullscreen mode, convert screen coordinates to game coordinates
             if self.is_fullscreen:
@@ -53,7 +64,7 @@ def handle_character_select_input(self):
                 self.state = GameState.TITLE
         elif event.type == pygame.MOUSEBUTTONDOWN:
             # Get mouse position in screen coordinates
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.get_mouse_pos()
             
             # Check if player clicked on a brawler card
             if hasattr(self, 'brawler_cards'):
@@ -68,7 +79,7 @@ def handle_character_select_input(self):
                             break
 
 def handle_gameplay_input(self):
-    """Handle input during gameplay"""
+    """Handle input during gameplay and return the player's actions"""
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             pygame.quit()
@@ -82,134 +93,118 @@ def handle_gameplay_input(self):
     # Get current key states
     keys = pygame.key.get_pressed()
     
-    # Move player based on arrow keys and WASD
+    # Turn the keys into player actions (arrow keys and WASD)
+    actions = {
+        "up": keys[pygame.K_UP] or keys[pygame.K_w],
+        "down": keys[pygame.K_DOWN] or keys[pygame.K_s],
+        "left": keys[pygame.K_LEFT] or keys[pygame.K_a],
+        "right": keys[pygame.K_RIGHT] or keys[pygame.K_d],
+        "shoot": keys[pygame.K_SPACE] or keys[pygame.K_RETURN]
+    }
+    
+    # The actions are applied once per simulation step by the game loop
+    return actions
+
+def apply_player_actions(self, actions):
+    """
+    Move and shoot with the player for one frame
+    
+    Args:
+        actions: Dictionary with boolean "up", "down", "left", "right" and
+                 "shoot" entries, from the keyboard or from a controller
+    """
+    # Move player based on the requested directions
     dx, dy = 0, 0
-    if keys[pygame.K_UP] or keys[pygame.K_w]:
-        dy -= self.player["speed"]
-        self.player["direction"] = 270
-    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-        dy += self.player["speed"]
-        self.player["direction"] = 90
-    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-        dx -= self.player["speed"]
-        self.player["direction"] = 180
-    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-        dx += self.player["speed"]
-        self.player["direction"] = 0
+    if actions["up"]:
+        dy -= self.player.speed
+        self.player.direction = 270
+    if actions["down"]:
+        dy += self.player.speed
+        self.player.direction = 90
+    if actions["left"]:
+        dx -= self.player.speed
+        self.player.direction = 180
+    if actions["right"]:
+        dx += self.player.speed
+        self.player.direction = 0
         
     # Diagonal movement - adjust direction and normalize speed
     if dx != 0 and dy != 0:
         if dx > 0 and dy < 0:
-            self.player["direction"] = 315
+            self.player.direction = 315
         elif dx > 0 and dy > 0:
-            self.player["direction"] = 45
+            self.player.direction = 45
         elif dx < 0 and dy > 0:
-            self.player["direction"] = 135
+            self.player.direction = 135
         elif dx < 0 and dy < 0:
-            self.player["direction"] = 225
+            self.player.direction = 225
             
         # Normalize diagonal movement
         magnitude = math.sqrt(dx**2 + dy**2)
-        dx = dx / magnitude * self.player["speed"]
-        dy = dy / magnitude * self.player["speed"]
+        dx = dx / magnitude * self.player.speed
+        dy = dy / magnitude * self.player.speed
     
     # Update player position and check for wall collisions
-    new_x = self.player["x"] + dx
-    new_y = self.player["y"] + dy
+    new_x = self.player.x + dx
+    new_y = self.player.y + dy
     
     # Check for wall collisions
     player_rect = pygame.Rect(
         new_x, new_y, 
-        self.player["width"], self.player["height"]
+        self.player.width, self.player.height
     )
-    
-    wall_collision = False
-    for wall in self.walls:
-        wall_rect = pygame.Rect(
-            wall["x"], wall["y"], 
-            wall["width"], wall["height"]
-        )
-        if player_rect.colliderect(wall_rect):
-            wall_collision = True
-            break
+    wall_collision = self.wall_grid.rect_overlaps_wall(*player_rect)
     
     if not wall_collision:
-        self.player["x"] = new_x
-        self.player["y"] = new_y
-    
-    # Initialize series shooting variables if they don't exist
-    if "burst_count" not in self.player:
-        self.player["burst_count"] = 0
-        self.player["burst_delay"] = 0
-        self.player["burst_max"] = 3  # Number of bullets in a burst
-        self.player["burst_interval"] = 100  # Milliseconds between shots in burst
+        self.player.x = new_x
+        self.player.y = new_y
     
     # Handle shooting with spacebar or enter
-    current_time = pygame.time.get_ticks()
-    
-    # Process any active shooting burst
-    if self.player["burst_count"] > 0 and current_time >= self.player["burst_delay"]:
-        # Fire the next shot in the series
-        self.player["burst_count"] -= 1
-        self.player["burst_delay"] = current_time + self.player["burst_interval"]
-        
-        # Calculate bullet starting position
-        angle_rad = math.radians(self.player["direction"])
-        bullet_x = self.player["x"] + self.player["width"] / 2 + math.cos(angle_rad) * 30
-        bullet_y = self.player["y"] + self.player["height"] / 2 + math.sin(angle_rad) * 30
-        
-        # Add a small spread for shotgun-like effect
-        spread = 10  # Degree of spread
-        spread_angle = self.player["direction"] + random.uniform(-spread, spread)
-        
-        # Play shooting sound
-        self.play_sound("shoot")
-        
-        # Create the bullet
-        self.create_bullet(
-            bullet_x, bullet_y, 
-            spread_angle,  # Use spread angle for more realism 
-            self.player["damage"], 
-            True, 
-            self.player["color"]
-        )
+    current_time = self.game_clock.get_ticks()
     
     # Start a new burst when spacebar or enter is pressed
-    if keys[pygame.K_SPACE] or keys[pygame.K_RETURN]:
-        time_since_last_attack = current_time - self.player["last_attack_time"]
+    if actions["shoot"]:
+        time_since_last_attack = current_time - self.player.last_attack_time
         
         # Check if enough time has passed for another attack series
-        if time_since_last_attack > 1000 / self.player["attack_speed"] and self.player["burst_count"] == 0:
-            self.player["last_attack_time"] = current_time
+        if time_since_last_attack > 1000 / self.player.attack_speed and self.player.burst_count == 0:
+            self.player.last_attack_time = current_time
             
-            # Start a new burst
-            self.player["burst_count"] = self.player["burst_max"]
-            self.player["burst_delay"] = current_time
-            
-            # Immediate first shot
-            angle_rad = math.radians(self.player["direction"])
-            bullet_x = self.player["x"] + self.player["width"] / 2 + math.cos(angle_rad) * 30
-            bullet_y = self.player["y"] + self.player["height"] / 2 + math.sin(angle_rad) * 30
-            
-            # Add a small spread
-            spread = 10
-            spread_angle = self.player["direction"] + random.uniform(-spread, spread)
-            
-            # Play shooting sound
-            self.play_sound("shoot")
-            
-            # Create the first bullet
-            self.create_bullet(
-                bullet_x, bullet_y, 
-                spread_angle,
-                self.player["damage"], 
-                True, 
-                self.player["color"]
-            )
-            
-            # Decrease remaining burst count and set delay for next shot
-            self.player["burst_count"] -= 1
-            self.player["burst_delay"] = current_time + self.player["burst_interval"]
+            # Start a new burst with an immediate first shot. The rest of the
+            # series is fired by timers on the game clock.
+            self.player.burst_count = self.player.burst_max
+            self.player.burst_delay = current_time
+            self.fire_player_burst_shot()
+
+def fire_player_burst_shot(self):
+    """Fire the next shot of the player's series and schedule the one after it"""
+    self.player.burst_count -= 1
+    
+    # Calculate bullet starting position
+    angle_rad = math.radians(self.player.direction)
+    bullet_x = self.player.x + self.player.width / 2 + math.cos(angle_rad) * 30
+    bullet_y = self.player.y + self.player.height / 2 + math.sin(angle_rad) * 30
+    
+    # Add a small spread for shotgun-like effect
+    spread = 10  # Degree of spread
+    spread_angle = self.player.direction + random.uniform(-spread, spread)
+    
+    # Play shooting sound
+    self.play_sound("shoot")
+    
+    # Create the bullet
+    self.create_bullet(
+        bullet_x, bullet_y, 
+        spread_angle,  # Use spread angle for more realism 
+        self.player.damage, 
+        True, 
+        self.player.color
+    )
+    
+    # Shots in a series are exactly burst_interval apart
+    if self.player.burst_count > 0:
+        self.player.burst_delay += self.player.burst_interval
+        self.game_clock.schedule_at(self.player.burst_delay, self.fire_player_burst_shot)
 
 def handle_game_over_input(self):
     """Handle input on the game over screen"""
@@ -244,8 +239,11 @@ def patch_pybrawl_input():
     """Patch the PyBrawl class with these input handler functions"""
     from game_engine import PyBrawl
     
+    PyBrawl.get_mouse_pos = get_mouse_pos
     PyBrawl.handle_title_screen_input = handle_title_screen_input
     PyBrawl.handle_character_select_input = handle_character_select_input
     PyBrawl.handle_gameplay_input = handle_gameplay_input
+    PyBrawl.apply_player_actions = apply_player_actions
+    PyBrawl.fire_player_burst_shot = fire_player_burst_shot
     PyBrawl.handle_game_over_input = handle_game_over_input
     PyBrawl.handle_win_screen_input = handle_win_screen_input
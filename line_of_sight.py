@@ -0,0 +1,226 @@
+# Line of sight on the wall grid.
+# Instead of testing a line against every wall, we walk along the line one
+# tile at a time (the Amanatides-Woo grid traversal) and stop at the first
+# wall tile we enter.
+#
+# The map never changes after it is generated, so the answers for every pair
+# of tiles can also be worked out once and kept in a VisibilityTable.
+import hashlib
+import math
+import os
+
+# Where precomputed visibility tables are saved between runs - next to the
+# game's files, whatever directory it is started from (ignored by git)
+VISIBILITY_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "visibility")
+
+class LineOfSight:
+    """Answers "can A see B?" using the tile occupancy grid"""
+
+    def __init__(self, wall_grid):
+        self.wall_grid = wall_grid
+        self.table = None  # Optional VisibilityTable with precomputed answers
+
+    def use_table(self, table):
+        """Answer line of sight from a precomputed VisibilityTable from now on"""
+        self.table = table
+
+    def is_clear(self, x1, y1, x2, y2):
+        """Check that no wall tile lies on the line from (x1, y1) to (x2, y2)"""
+        grid = self.wall_grid
+        tile_size = grid.tile_size
+        cells = grid.cells
+        width = grid.width
+        height = grid.height
+
+        # Tiles where the line starts and ends
+        tile_x = math.floor(x1 / tile_size)
+        tile_y = math.floor(y1 / tile_size)
+        end_x = math.floor(x2 / tile_size)
+        end_y = math.floor(y2 / tile_size)
+
+        if 0 <= tile_x < width and 0 <= tile_y < height and cells[tile_y * width + tile_x]:
+            return False
+
+        dx = x2 - x1
+        dy = y2 - y1
+
+        # For each axis: which way we step, how far along the line (0..1) the
+        # next tile border is, and how far apart the borders are
+        if dx > 0:
+            step_x = 1
+            next_x = ((tile_x + 1) * tile_size - x1) / dx
+            delta_x = tile_size / dx
+        elif dx < 0:
+            step_x = -1
+            next_x = (tile_x * tile_size - x1) / dx
+            delta_x = -tile_size / dx
+        else:
+            step_x = 0
+            next_x = delta_x = math.inf
+
+        if dy > 0:
+            step_y = 1
+            next_y = ((tile_y + 1) * tile_size - y1) / dy
+            delta_y = tile_size / dy
+        elif dy < 0:
+            step_y = -1
+            next_y = (tile_y * tile_size - y1) / dy
+            delta_y = -tile_size / dy
+        else:
+            step_y = 0
+            next_y = delta_y = math.inf
+
+        # Every step crosses one tile border, so we know how many of each are left
+        remaining_x = abs(end_x - tile_x)
+        remaining_y = abs(end_y - tile_y)
+
+        while remaining_x or remaining_y:
+            # Cross whichever border comes first
+            if remaining_y == 0 or (remaining_x and next_x < next_y):
+                tile_x += step_x
+                next_x += delta_x
+                remaining_x -= 1
+            elif remaining_x == 0 or next_y < next_x:
+                tile_y += step_y
+                next_y += delta_y
+                remaining_y -= 1
+            else:
+                # The line passes exactly through a corner and touches both side tiles
+                if (grid.is_wall_tile(tile_x + step_x, tile_y) or
+                        grid.is_wall_tile(tile_x, tile_y + step_y)):
+                    return False
+                tile_x += step_x
+                tile_y += step_y
+                next_x += delta_x
+                next_y += delta_y
+                remaining_x -= 1
+                remaining_y -= 1
+
+            if 0 <= tile_x < width and 0 <= tile_y < height and cells[tile_y * width + tile_x]:
+                return False
+
+        return True
+
+    def visible_to_target(self, points, target_x, target_y):
+        """
+        Answer line of sight from many points to one target in a single call.
+
+        Returns a list of booleans in the same order as points. With a
+        visibility table these are lookups between the tiles the points are on.
+        """
+        table = self.table
+        if table is not None:
+            target_tile = table.tile_index(target_x, target_y)
+            if target_tile is not None:
+                return [table.lookup(x, y, target_tile) for x, y in points]
+
+        is_clear = self.is_clear
+        results = []
+        seen = {}  # Enemies standing on the same spot share the answer
+        for x, y in points:
+            key = (x, y)
+            if key not in seen:
+                seen[key] = is_clear(x, y, target_x, target_y)
+            results.append(seen[key])
+        return results
+
+class VisibilityTable:
+    """
+    Precomputed line of sight between the centers of every pair of tiles.
+
+    Stored as a bitset with one bit per (tile, tile) pair. Wall tiles see nothing.
+    """
+
+    def __init__(self, wall_grid, bits=None):
+        self.width = wall_grid.width
+        self.height = wall_grid.height
+        self.tile_size = wall_grid.tile_size
+        self.tile_count = self.width * self.height
+
+        if bits is None:
+            bits = self.compute_bits(wall_grid)
+        self.bits = bits
+
+    @staticmethod
+    def bitset_size(wall_grid):
+        """Number of bytes needed for every pair of tiles"""
+        tile_count = wall_grid.width * wall_grid.height
+        return (tile_count * tile_count + 7) // 8
+
+    def compute_bits(self, wall_grid):
+        """Trace the line between every pair of open tile centers"""
+        line_of_sight = LineOfSight(wall_grid)
+        tile_size = self.tile_size
+        tile_count = self.tile_count
+        bits = bytearray(self.bitset_size(wall_grid))
+
+        open_tiles = [
+            (index, (index % self.width + 0.5) * tile_size, (index // self.width + 0.5) * tile_size)
+            for index in range(tile_count)
+            if not wall_grid.cells[index]
+        ]
+
+        for position, (tile_a, ax, ay) in enumerate(open_tiles):
+            # A tile always sees itself
+            bit = tile_a * tile_count + tile_a
+            bits[bit >> 3] |= 1 << (bit & 7)
+
+            # Lines are the same in both directions, so each pair is traced once
+            for tile_b, bx, by in open_tiles[position + 1:]:
+                if line_of_sight.is_clear(ax, ay, bx, by):
+                    bit = tile_a * tile_count + tile_b
+                    bits[bit >> 3] |= 1 << (bit & 7)
+                    bit = tile_b * tile_count + tile_a
+                    bits[bit >> 3] |= 1 << (bit & 7)
+
+        return bits
+
+    def tile_index(self, x, y):
+        """Index of the tile under a point, or None outside the map"""
+        tile_x = int(x // self.tile_size)
+        tile_y = int(y // self.tile_size)
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return tile_y * self.width + tile_x
+        return None
+
+    def tiles_visible(self, tile_a, tile_b):
+        """Check if the centers of two tiles (by index) can see each other"""
+        bit = tile_a * self.tile_count + tile_b
+        return (self.bits[bit >> 3] >> (bit & 7)) & 1 == 1
+
+    def lookup(self, x, y, target_tile):
+        """Check if the tile under a point can see the target tile"""
+        tile = self.tile_index(x, y)
+        if tile is None:
+            return True  # Nothing blocks the view outside the map
+        return self.tiles_visible(tile, target_tile)
+
+    @staticmethod
+    def cache_key(wall_grid):
+        """Name that identifies a map layout"""
+        digest = hashlib.sha1()
+        digest.update(f"{wall_grid.width}x{wall_grid.height}x{wall_grid.tile_size}:".encode())
+        digest.update(bytes(wall_grid.cells))
+        return digest.hexdigest()
+
+    @classmethod
+    def load_or_build(cls, wall_grid, cache_dir=VISIBILITY_CACHE_DIR):
+        """Load the table for this map layout from disk, or build and save it"""
+        path = os.path.join(cache_dir, cls.cache_key(wall_grid) + ".bin")
+
+        try:
+            with open(path, "rb") as cache_file:
+                bits = bytearray(cache_file.read())
+            if len(bits) == cls.bitset_size(wall_grid):
+                return cls(wall_grid, bits)
+        except OSError:
+            pass  # Not cached yet
+
+        table = cls(wall_grid)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "wb") as cache_file:
+                cache_file.write(table.bits)
+        except OSError as e:
+            print(f"Could not save visibility table: {e}")
+        return table
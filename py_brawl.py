@@ -1,12 +1,11 @@
-import pygame
 import sys
 import random
 import os
 import math
 from enum import Enum
 
-# Initialize pygame
-pygame.init()
+# pygame is started by PyBrawl for windowed games only - headless matches
+# never open a window or an audio device
 
 # Game constants
 SCREEN_WIDTH = 800
@@ -45,8 +44,45 @@ patch_renderer()
 # Add BRAWLERS to PyBrawl class
 PyBrawl.BRAWLERS = BRAWLERS
 
+def run_headless_matches(matches, brawler_name, seed=None, visibility_table=False):
+    """Play a batch of matches without a window and print a summary"""
+    from controllers import SimpleAIController
+    
+    if seed is not None:
+        random.seed(seed)
+    
+    wins = 0
+    for match in range(matches):
+        game = PyBrawl(headless=True, controller=SimpleAIController(seed=match))
+        game.use_visibility_table = visibility_table
+        result = game.run_headless(brawler_name)
+        if result["won"]:
+            wins += 1
+        print(f"Match {match+1}: {result['result']} - score {result['score']}, "
+              f"wave {result['wave']}, {result['frames']} frames")
+    
+    print(f"{brawler_name} won {wins} of {matches} matches")
+
 # Run the game if the script is executed directly
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Py Brawl")
+    parser.add_argument("--headless", type=int, metavar="MATCHES",
+                        help="simulate this many matches without a window")
+    parser.add_argument("--brawler", default="Shelly", choices=list(BRAWLERS),
+                        help="brawler used for headless matches")
+    parser.add_argument("--seed", type=int, help="random seed for headless matches")
+    parser.add_argument("--visibility-table", action="store_true",
+                        help="precompute line of sight for each map (cached in .cache/)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw the parts of the screen that change during gameplay")
+    args = parser.parse_args()
+    
+    if args.headless:
+        run_headless_matches(args.headless, args.brawler, args.seed, args.visibility_table)
+        sys.exit()
+    
     # Print welcome message
     print("Starting Py Brawl - A simplified Brawl Stars inspired game!")
     print("Controls:")
@@ -55,4 +91,5 @@ if __name__ == "__main__":
     print("  - ESC: Return to title screen")
     
     game = PyBrawl()
+    game.use_dirty_rects = args.dirty_rects
     game.run()
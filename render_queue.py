@@ -0,0 +1,47 @@
+# Render queue for gameplay frames.
+# Instead of blitting each sprite and piece of text as soon as it is worked
+# out, the draw code adds it to a layer here. Each layer is then drawn with a
+# single Surface.blits call, which saves a trip from Python into pygame for
+# every sprite when there are hundreds of them on screen.
+import pygame
+
+# Layers, drawn from first to last
+LAYER_BULLETS = 0
+LAYER_UNITS = 1  # Player, enemies and graves
+LAYER_BARS = 2  # Health and ammo bars
+LAYER_LABELS = 3  # Names, boss icons and HUD
+LAYER_COUNT = 4
+
+class RenderQueue:
+    """Blits collected per layer and drawn one layer at a time"""
+
+    def __init__(self, layer_count=LAYER_COUNT):
+        # One list of (surface, dest, area, special_flags) per layer
+        self.layers = [[] for _ in range(layer_count)]
+
+    def add(self, layer, surface, dest, area=None, special_flags=0):
+        """
+        Queue a blit on a layer.
+
+        Returns the screen area it will cover (pygame.Rect), so callers can
+        keep track of what they drew before anything is actually drawn.
+        """
+        self.layers[layer].append((surface, dest, area, special_flags))
+        if area is None:
+            return pygame.Rect(dest, surface.get_size())
+        return pygame.Rect(dest, pygame.Rect(area).size)
+
+    def flush(self, target, layers=None):
+        """Draw the given layers (all of them by default) onto target and empty them"""
+        if layers is None:
+            layers = range(len(self.layers))
+        for layer in layers:
+            entries = self.layers[layer]
+            if entries:
+                target.blits(entries, False)
+                entries.clear()
+
+    def clear(self):
+        """Throw away everything queued"""
+        for entries in self.layers:
+            entries.clear()
@@ -3,7 +3,9 @@ import random
 import math
 from game_engine import GameState, SCREEN_WIDTH, SCREEN_HEIGHT, PyBrawl
 from sprites import SpriteManager
-import os
+from render_queue import LAYER_BULLETS, LAYER_UNITS, LAYER_BARS, LAYER_LABELS
+from widgets import ICON_SIZE
+from effects import KILL_NOTICE, FLOATING_TEXT
 
 # Colors
 WHITE = (255, 255, 255)
@@ -15,6 +17,37 @@ YELLOW = (255, 255, 0)
 BROWN = (165, 42, 42)
 DARK_BLUE = (25, 25, 112)
 
+def draw_menu_background(self, name, overlay_alpha):
+    """
+    Draw a menu background image over the game area, darkened by a black
+    overlay (alpha 0-255) so text stays readable. Images come from the asset
+    registry, already scaled. Returns False if the image is not available.
+    """
+    # Calculate dimensions to cover the entire screen/game area
+    if self.is_fullscreen:
+        # In fullscreen, cover the game area
+        target_width = int(self.original_width * self.scale_factor)
+        target_height = int(self.original_height * self.scale_factor)
+        target_x = self.x_offset
+        target_y = self.y_offset
+    else:
+        # In windowed mode, cover the entire window
+        target_width = SCREEN_WIDTH
+        target_height = SCREEN_HEIGHT
+        target_x = 0
+        target_y = 0
+    
+    image = self.assets.get_background(name, target_width, target_height)
+    if image is None:
+        return False
+    
+    self.screen.blit(image, (target_x, target_y))
+    
+    # Add a semi-transparent overlay for better text readability
+    overlay = self.assets.get_overlay(target_width, target_height, overlay_alpha)
+    self.screen.blit(overlay, (target_x, target_y))
+    return True
+
 def draw_title_screen(self):
     """Draw the title screen"""
     # Background
@@ -25,41 +58,8 @@ def draw_title_screen(self):
         # In windowed mode, just fill the screen
         self.screen.fill(BLACK)
     
-    # Load and display title image as full screen background
-    title_path = os.path.join("assets", "title.png")
-    if os.path.exists(title_path):
-        try:
-            title_image = pygame.image.load(title_path).convert_alpha()
-            
-            # Calculate dimensions to cover the entire screen/game area
-            if self.is_fullscreen:
-                # In fullscreen, cover the game area
-                scaled_width = int(self.original_width * self.scale_factor)
-                scaled_height = int(self.original_height * self.scale_factor)
-                target_width = scaled_width
-                target_height = scaled_height
-                target_x = self.x_offset
-                target_y = self.y_offset
-            else:
-                # In windowed mode, cover the entire window
-                target_width = SCREEN_WIDTH
-                target_height = SCREEN_HEIGHT
-                target_x = 0
-                target_y = 0
-            
-            # Scale the image to cover the entire screen/game area
-            title_image = pygame.transform.scale(title_image, (target_width, target_height))
-            
-            # Draw the title image as background
-            self.screen.blit(title_image, (target_x, target_y))
-            
-            # Add a semi-transparent overlay for better text readability
-            overlay = pygame.Surface((target_width, target_height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))  # Black with 50% transparency
-            self.screen.blit(overlay, (target_x, target_y))
-            
-        except Exception as e:
-            print(f"Error loading title image: {e}")
+    # Display title image as full screen background
+    self.draw_menu_background("title", 128)  # Black with 50% transparency on top
     
     # Subtitle - position it at the bottom
     self.draw_outlined_text("A Simple Brawl Stars Inspired Game", self.menu_font, WHITE, 
@@ -83,7 +83,7 @@ def draw_title_screen(self):
     text_color = WHITE
     
     # Get mouse position for hover effects
-    mouse_x, mouse_y = pygame.mouse.get_pos()
+    mouse_x, mouse_y = self.get_mouse_pos()
     
     # Adjust mouse position if in fullscreen
     if self.is_fullscreen:
@@ -128,7 +128,7 @@ def draw_title_screen(self):
                   menu_center_x, self.exit_button_rect.centery, outline_color=BLACK, outline_width=1)
     
     # Create small hint font for keyboard shortcuts
-    hint_font = pygame.font.SysFont("Arial", 12)
+    hint_font = self.fonts.get("Arial", 12)
     
     # Add small keyboard shortcut hints below each button
     continue_hint_y = self.continue_button_rect.bottom + 5
@@ -230,7 +230,7 @@ def draw_title_screen(self):
                         (icon_rect.right, icon_rect.bottom - corner_length), 2)
     
     # Add small "F11" hint text below
-    hint_font = pygame.font.SysFont("Arial", 12)
+    hint_font = self.fonts.get("Arial", 12)
     hint_y = self.fullscreen_button_rect.bottom + 5
     self.draw_outlined_text("F11", hint_font, WHITE, 
                            self.fullscreen_button_rect.centerx, hint_y, 
@@ -360,7 +360,7 @@ def draw_character_select(self):
             self.screen.blit(question_text, question_rect)
         
         # Draw stats - adjust positioning and use smaller font
-        stats_font = pygame.font.SysFont("Arial", 16)  # Smaller font for stats
+        stats_font = self.fonts.get("Arial", 16)  # Smaller font for stats
         
         # Draw HP stat
         self.draw_text(f"HP: {brawler['health']}", stats_font, WHITE, 
@@ -375,75 +375,44 @@ def draw_character_select(self):
 
 def draw_gameplay(self):
     """Draw the gameplay screen"""
-    if self.is_fullscreen:
-        # In fullscreen mode, fill the entire screen first with black
-        self.screen.fill((0, 0, 0))
-        
-        # Calculate the scaled size for the game area
-        scaled_width = int(self.original_width * self.scale_factor)
-        scaled_height = int(self.original_height * self.scale_factor)
-        
-        # Create a surface for the gameplay area
-        gameplay_bg = pygame.Surface((scaled_width, scaled_height))
+    # In dirty rectangle mode only the areas drawn over last frame are
+    # repainted from the map layer, unless everything has to be drawn again
+    # (new map, new display mode or coming back from another screen)
+    full_redraw = (not self.use_dirty_rects or self.map_layer is None or
+                   self.previous_drawn_rects is None)
+    
+    if full_redraw:
+        if self.is_fullscreen:
+            # In fullscreen mode, fill the entire screen first with black
+            self.screen.fill((0, 0, 0))
         
-        # Fill with ground tiles if sprite manager is available
-        if hasattr(self, 'sprite_manager') and 'ground' in self.sprite_manager.sprites:
-            # Calculate how many tiles we need to fill the screen
-            tile_size = 40  # Size of each tile when drawn
-            tile_size_scaled = int(tile_size * self.scale_factor)
-            tiles_x = (scaled_width + tile_size_scaled - 1) // tile_size_scaled
-            tiles_y = (scaled_height + tile_size_scaled - 1) // tile_size_scaled
-            
-            # Fill the background with ground tiles
-            for x in range(tiles_x):
-                for y in range(tiles_y):
-                    ground_tile = self.sprite_manager.get_tile_sprite(
-                        'ground', tile_size_scaled, tile_size_scaled
-                    )
-                    gameplay_bg.blit(ground_tile, (x * tile_size_scaled, y * tile_size_scaled))
-        else:
-            # Fallback to solid color if sprite not available
-            gameplay_bg.fill(BROWN)  # Brown background for the gameplay area
-            
-        self.screen.blit(gameplay_bg, (self.x_offset, self.y_offset))
+        # Draw map elements
+        self.draw_map()
     else:
-        # In windowed mode, fill the screen with ground tiles
-        if hasattr(self, 'sprite_manager') and 'ground' in self.sprite_manager.sprites:
-            # Clear the screen first
-            self.screen.fill((0, 0, 0))
-            
-            # Calculate how many tiles we need to fill the screen
-            tile_size = 40  # Size of each tile when drawn
-            tiles_x = (SCREEN_WIDTH + tile_size - 1) // tile_size
-            tiles_y = (SCREEN_HEIGHT + tile_size - 1) // tile_size
-            
-            # Fill the background with ground tiles
-            for x in range(tiles_x):
-                for y in range(tiles_y):
-                    ground_tile = self.sprite_manager.get_tile_sprite(
-                        'ground', tile_size, tile_size
-                    )
-                    self.screen.blit(ground_tile, (x * tile_size, y * tile_size))
-        else:
-            # Fallback to solid color if sprite not available
-            self.screen.fill(BROWN)  # Brown background for the gameplay area
-    
-    # Draw map elements
-    self.draw_map()
-    
-    # Draw bullets
-    for bullet in self.bullets:
-        # Draw a colored circle for bullets
-        pygame.draw.circle(
-            self.screen, 
-            bullet["color"] if "color" in bullet else (255, 255, 255), 
-            self.scale_position(bullet["x"], bullet["y"]),
-            int(bullet["radius"] * self.scale_factor) if "radius" in bullet else 5
-        )
+        self.restore_map_areas(self.previous_drawn_rects)
+    
+    # Screen areas drawn over this frame, one per entity or piece of text
+    drawn = self.drawn_rects = []
+    
+    # Sprites and text are queued by layer and drawn with one blits call per
+    # layer; shapes (bars, lines) are drawn in between, after what they cover
+    queue = self.render_queue
+    
+    # Queue bullets straight from the bullet pool's columns
+    bullets = self.bullets
+    for i in range(bullets.count):
+        # A pre-drawn circle in the bullet's color
+        radius = int(bullets.radius[i] * self.scale_factor)
+        center_x, center_y = self.scale_position(bullets.x[i], bullets.y[i])
+        drawn.append(queue.add(
+            LAYER_BULLETS,
+            self.sprite_manager.get_bullet_sprite(bullets.palette[bullets.color_index[i]], radius),
+            (int(center_x) - radius, int(center_y) - radius)
+        ))
     
     # Draw player
     player_rect = self.scale_position(
-        pygame.Rect(self.player["x"], self.player["y"], self.player["width"], self.player["height"])
+        pygame.Rect(self.player.x, self.player.y, self.player.width, self.player.height)
     )
     
     # Draw player with sprite if available
@@ -454,56 +423,47 @@ def draw_gameplay(self):
             player_sprite = self.sprite_manager.get_scaled_sprite(
                 sprite_key, player_rect.width, player_rect.height
             )
-            self.screen.blit(player_sprite, player_rect)
+            queue.add(LAYER_UNITS, player_sprite, player_rect.topleft)
             player_sprite_drawn = True
     
+    # Bullets and the player sprite go down before the aim lines
+    queue.flush(self.screen, (LAYER_BULLETS, LAYER_UNITS))
+    
     # If no sprite available, fallback to a colored square
     if not player_sprite_drawn:
-        pygame.draw.rect(self.screen, self.player["color"], player_rect)
+        pygame.draw.rect(self.screen, self.player.color, player_rect)
         pygame.draw.rect(self.screen, WHITE, player_rect, 2)  # White border
     
+    # Everything drawn around the player (bars, aim line) is added to this area
+    player_area = player_rect.copy()
+    
     # Draw health bar above player
-    player_health_percentage = self.player["health"] / self.player["max_health"]
-    health_bar_width = int(self.player["width"] * 1.5)  # Make health bar wider than player
+    player_health_percentage = self.player.health / self.player.max_health
+    health_bar_width = int(self.player.width * 1.5)  # Make health bar wider than player
     health_bar_height = 5  # Slim health bar
+    health_bar_x = player_rect.x - (health_bar_width - player_rect.width) // 2  # Center above player
     
-    # Background of health bar (dark red background)
-    pygame.draw.rect(
-        self.screen,
-        (100, 0, 0),  # Dark red
-        pygame.Rect(
-            player_rect.x - (health_bar_width - player_rect.width) // 2,  # Center above player
-            player_rect.y - health_bar_height - 2,  # Just above player
-            health_bar_width,
-            health_bar_height
-        )
-    )
-    
-    # Foreground of health bar (green for remaining health)
-    pygame.draw.rect(
-        self.screen,
-        (0, 200, 0),  # Green
-        pygame.Rect(
-            player_rect.x - (health_bar_width - player_rect.width) // 2,
-            player_rect.y - health_bar_height - 2,
-            int(health_bar_width * player_health_percentage),
-            health_bar_height
-        )
+    # Green for remaining health on a dark red background, as one ready-made bar
+    strip, area = self.widgets.bar(
+        health_bar_width, health_bar_height, player_health_percentage, (0, 200, 0), (100, 0, 0)
     )
+    player_area.union_ip(queue.add(
+        LAYER_BARS, strip, (health_bar_x, player_rect.y - health_bar_height - 2), area
+    ))
     
     # Draw ammo reload indicator below health bar
-    current_time = pygame.time.get_ticks()
+    current_time = self.game_clock.get_ticks()
     ammo_bar_width = int(health_bar_width / 3) - 2  # Width of each ammo segment, slightly narrower
     ammo_bar_height = 4  # Thinner than health bar
     ammo_bar_spacing = 2  # Space between ammo segments
     ammo_bar_y = player_rect.y - health_bar_height - ammo_bar_height - 4  # Position above health bar
-    ammo_bar_x_start = player_rect.x - (health_bar_width - player_rect.width) // 2  # Align with health bar
+    ammo_bar_x_start = health_bar_x  # Align with health bar
     
     # Get player's burst info and attack cooldown
-    burst_max = self.player.get("burst_max", 3)
-    burst_count = self.player.get("burst_count", 0)
-    attack_cooldown = 1000 / self.player.get("attack_speed", 1.0)  # Milliseconds between attacks
-    time_since_attack = current_time - self.player.get("last_attack_time", 0)
+    burst_max = self.player.burst_max
+    burst_count = self.player.burst_count
+    attack_cooldown = 1000 / self.player.attack_speed  # Milliseconds between attacks
+    time_since_attack = current_time - self.player.last_attack_time
     reload_progress = min(1.0, time_since_attack / attack_cooldown)
     
     # Calculate how many complete ammo are ready and the progress of the next one
@@ -529,72 +489,53 @@ def draw_gameplay(self):
         index_from_right = burst_max - i - 1
         ammo_x = ammo_bar_x_start + index_from_right * (ammo_bar_width + ammo_bar_spacing)
         
-        # Background of ammo bar (dark gray)
-        pygame.draw.rect(
-            self.screen,
-            (50, 50, 50),  # Dark gray
-            pygame.Rect(
-                ammo_x,
-                ammo_bar_y,
-                ammo_bar_width,
-                ammo_bar_height
-            )
-        )
-        
         # Determine ammo status based on position
         if index_from_right < complete_ammo:
             # Fully charged ammo - yellow
-            ammo_fill_width = ammo_bar_width
+            ammo_fill = 1.0
             ammo_color = (200, 200, 50)  # Yellow
         elif index_from_right == complete_ammo and next_ammo_progress > 0:
             # Currently charging ammo - blue with progress
-            ammo_fill_width = int(ammo_bar_width * next_ammo_progress)
+            ammo_fill = next_ammo_progress
             ammo_color = (50, 150, 255)  # Blue for reloading
         else:
-            # Empty ammo - no fill
-            ammo_fill_width = 0
-            ammo_color = None
+            # Empty ammo - just the dark gray background
+            ammo_fill = 0.0
+            ammo_color = (200, 200, 50)
         
-        # Draw filled portion of ammo bar
-        if ammo_fill_width > 0:
-            pygame.draw.rect(
-                self.screen,
-                ammo_color,
-                pygame.Rect(
-                    ammo_x,
-                    ammo_bar_y,
-                    ammo_fill_width,
-                    ammo_bar_height
-                )
-            )
+        strip, area = self.widgets.bar(
+            ammo_bar_width, ammo_bar_height, ammo_fill, ammo_color, (50, 50, 50)
+        )
+        player_area.union_ip(queue.add(LAYER_BARS, strip, (ammo_x, ammo_bar_y), area))
     
     # Draw player aim direction line
-    if "direction" in self.player:
-        angle_rad = math.radians(self.player["direction"])
-        start_x = self.player["x"] + self.player["width"] / 2
-        start_y = self.player["y"] + self.player["height"] / 2
-        end_x = start_x + math.cos(angle_rad) * 30
-        end_y = start_y + math.sin(angle_rad) * 30
-        
-        pygame.draw.line(
-            self.screen,
-            (255, 255, 255),  # White line for player
-            self.scale_position(start_x, start_y),
-            self.scale_position(end_x, end_y),
-            3
-        )
+    angle_rad = math.radians(self.player.direction)
+    start_x = self.player.x + self.player.width / 2
+    start_y = self.player.y + self.player.height / 2
+    end_x = start_x + math.cos(angle_rad) * 30
+    end_y = start_y + math.sin(angle_rad) * 30
+    
+    player_area.union_ip(pygame.draw.line(
+        self.screen,
+        (255, 255, 255),  # White line for player
+        self.scale_position(start_x, start_y),
+        self.scale_position(end_x, end_y),
+        3
+    ))
+    
+    drawn.append(player_area)
     
     # Draw enemies
     self.draw_enemies()
     
     # Draw player health bar and number
-    player_health_percent = self.player["health"] / self.player["max_health"]
+    player_health_percent = self.player.health / self.player.max_health
     player_health_bar_width = 200
     player_health_bar_height = 20
     player_health_bar_x = 120  # Moved to center better
     player_health_bar_y = 20  # Moved up further
     
-    # Background of health bar (red)
+    # Area of the health bar
     health_bar_bg_rect = pygame.Rect(
         player_health_bar_x - player_health_bar_width // 2, 
         player_health_bar_y - player_health_bar_height // 2,
@@ -602,25 +543,18 @@ def draw_gameplay(self):
         player_health_bar_height
     )
     health_bar_bg_rect = self.scale_position(health_bar_bg_rect)
-    pygame.draw.rect(self.screen, RED, health_bar_bg_rect)
     
-    # Foreground of health bar (green for remaining health)
-    health_bar_fg_width = int(player_health_bar_width * player_health_percent)
-    health_bar_fg_rect = pygame.Rect(
-        player_health_bar_x - player_health_bar_width // 2, 
-        player_health_bar_y - player_health_bar_height // 2,
-        health_bar_fg_width, 
-        player_health_bar_height
+    # Green for remaining health with a white border, queued after the enemy
+    # names so the HUD stays on top of them
+    strip, area = self.widgets.bar(
+        health_bar_bg_rect.width, health_bar_bg_rect.height, player_health_percent,
+        GREEN, RED, WHITE, 2
     )
-    health_bar_fg_rect = self.scale_position(health_bar_fg_rect)
-    pygame.draw.rect(self.screen, GREEN, health_bar_fg_rect)
-    
-    # Border for health bar
-    pygame.draw.rect(self.screen, WHITE, health_bar_bg_rect, 2)
+    drawn.append(queue.add(LAYER_LABELS, strip, health_bar_bg_rect.topleft, area))
     
     # Health number
-    health_text = f"{self.player['health']}/{self.player['max_health']}"
-    self.draw_outlined_text(
+    health_text = f"{self.player.health}/{self.player.max_health}"
+    drawn.append(self.draw_outlined_text(
         health_text, 
         self.info_font, 
         WHITE, 
@@ -628,71 +562,127 @@ def draw_gameplay(self):
         player_health_bar_y, 
         outline_color=BLACK,
         outline_width=1,
-        centered=True
-    )
+        centered=True,
+        layer=LAYER_LABELS
+    ))
     
     # Combine wave and enemies information in a single line with outlined text
-    wave_enemies_text = f"Wave: {self.current_wave}/{self.max_waves} | Enemies: {len([e for e in self.enemies if e['health'] > 0])}/{len(self.enemies)}"
-    self.draw_outlined_text(
+    wave_enemies_text = f"Wave: {self.current_wave}/{self.max_waves} | Enemies: {len([e for e in self.enemies if e.health > 0])}/{len(self.enemies)}"
+    drawn.append(self.draw_outlined_text(
         wave_enemies_text, 
         self.info_font, 
         WHITE, 
         SCREEN_WIDTH - 150, 
         20,  # Moved up
         outline_color=BLACK,
-        outline_width=1
-    )
+        outline_width=1,
+        layer=LAYER_LABELS
+    ))
     
     # Draw game controller info with outlined text
     controls_text = "Arrow Keys: Move | Spacebar: Shoot | ESC: Menu"
-    self.draw_outlined_text(
+    drawn.append(self.draw_outlined_text(
         controls_text, 
         self.info_font, 
         WHITE, 
         SCREEN_WIDTH // 2, 
         SCREEN_HEIGHT - 20,
         outline_color=BLACK,
-        outline_width=1
-    )
+        outline_width=1,
+        layer=LAYER_LABELS
+    ))
     
-    # Draw kill notifications
-    self.draw_kill_notifications()
+    # Draw floating text and kill notifications
+    self.draw_effects()
+    
+    queue.flush(self.screen)
+    
+    # Screen areas to send to the display this frame (see present_frame)
+    if full_redraw:
+        self.update_rects = None  # The whole screen
+    else:
+        self.update_rects = self.previous_drawn_rects + drawn
+    self.previous_drawn_rects = drawn
 
 def draw_map(self):
-    """Draw the game map with walls and bushes"""
-    # Use existing map elements (walls and bushes) from the game engine
+    """Draw the ground, walls and bushes"""
+    # The map never changes during a match, so it is drawn once into the
+    # map layer and that one surface is copied to the screen every frame
+    if self.map_layer is None:
+        self.map_layer = self.build_map_layer()
     
-    # Draw walls
-    for wall in self.walls:
-        wall_rect = self.scale_position(
-            pygame.Rect(wall["x"], wall["y"], wall["width"], wall["height"])
+    self.screen.blit(self.map_layer, (self.x_offset, self.y_offset))
+
+def restore_map_areas(self, rects):
+    """Paint the map layer back over screen areas drawn on last frame"""
+    layer = self.map_layer
+    x_offset = self.x_offset
+    y_offset = self.y_offset
+    map_area = layer.get_rect(topleft=(x_offset, y_offset))
+    for rect in rects:
+        visible = rect.clip(map_area)
+        if visible != rect:
+            # Partly outside the map, in fullscreen: clear the letterbox part
+            self.screen.fill(BLACK, rect)
+        self.screen.blit(layer, visible, visible.move(-x_offset, -y_offset))
+
+def build_map_layer(self):
+    """Draw the ground, walls and bushes at the current scale into one surface"""
+    scaled_width = int(self.original_width * self.scale_factor)
+    scaled_height = int(self.original_height * self.scale_factor)
+    layer = pygame.Surface((scaled_width, scaled_height))
+    
+    # Fill with ground tiles if sprite manager is available
+    if hasattr(self, 'sprite_manager') and 'ground' in self.sprite_manager.sprites:
+        # Calculate how many tiles we need to fill the game area
+        tile_size_scaled = int(self.tile_size * self.scale_factor)
+        tiles_x = (scaled_width + tile_size_scaled - 1) // tile_size_scaled
+        tiles_y = (scaled_height + tile_size_scaled - 1) // tile_size_scaled
+        
+        # Every ground tile looks the same, so scale the sprite only once
+        ground_tile = self.sprite_manager.get_tile_sprite(
+            'ground', tile_size_scaled, tile_size_scaled
         )
+        layer.blits([
+            (ground_tile, (x * tile_size_scaled, y * tile_size_scaled))
+            for x in range(tiles_x)
+            for y in range(tiles_y)
+        ], False)
+    else:
+        # Fallback to solid color if sprite not available
+        layer.fill(BROWN)  # Brown background for the gameplay area
+    
+    # Scaled sprites by (name, width, height) - walls and bushes are all one size
+    scaled_sprites = {}
+    
+    def draw_tile(sprite_name, fallback_color, element):
+        # Position inside the layer, which is drawn at the screen offsets later
+        rect = self.scale_position(
+            pygame.Rect(element["x"], element["y"], element["width"], element["height"])
+        ).move(-self.x_offset, -self.y_offset)
         
-        # Draw wall with sprite if available
+        # Draw with sprite if available
         if hasattr(self, 'sprite_manager'):
-            wall_sprite = self.sprite_manager.get_tile_sprite(
-                'wall', wall_rect.width, wall_rect.height
-            )
-            self.screen.blit(wall_sprite, wall_rect)
+            key = (sprite_name, rect.width, rect.height)
+            if key not in scaled_sprites:
+                scaled_sprites[key] = self.sprite_manager.get_tile_sprite(
+                    sprite_name, rect.width, rect.height
+                )
+            layer.blit(scaled_sprites[key], rect)
         else:
             # Fallback to colored rectangle
-            pygame.draw.rect(self.screen, BLUE, wall_rect)
+            pygame.draw.rect(layer, fallback_color, rect)
+    
+    # Draw walls
+    for wall in self.walls:
+        draw_tile('wall', BLUE, wall)
     
     # Draw bushes
     for bush in self.bushes:
-        bush_rect = self.scale_position(
-            pygame.Rect(bush["x"], bush["y"], bush["width"], bush["height"])
-        )
-        
-        # Draw bush with sprite if available
-        if hasattr(self, 'sprite_manager'):
-            grass_sprite = self.sprite_manager.get_tile_sprite(
-                'grass', bush_rect.width, bush_rect.height
-            )
-            self.screen.blit(grass_sprite, bush_rect)
-        else:
-            # Fallback to colored rectangle
-            pygame.draw.rect(self.screen, GREEN, bush_rect)
+        draw_tile('grass', GREEN, bush)
+    
+    # Match the display's pixel format so the per-frame copy is as fast as possible
+    return layer.convert()
 
 def draw_game_over(self):
     """Draw the game over screen"""
@@ -704,49 +694,10 @@ def draw_game_over(self):
         # In windowed mode, just fill the screen
         self.screen.fill((0, 0, 0))
     
-    # Load and display lose image as background
-    lose_path = os.path.join("assets", "lose.png")
-    if os.path.exists(lose_path):
-        try:
-            lose_image = pygame.image.load(lose_path).convert_alpha()
-            
-            # Calculate dimensions to cover the entire screen/game area
-            if self.is_fullscreen:
-                # In fullscreen, cover the game area
-                scaled_width = int(self.original_width * self.scale_factor)
-                scaled_height = int(self.original_height * self.scale_factor)
-                target_width = scaled_width
-                target_height = scaled_height
-                target_x = self.x_offset
-                target_y = self.y_offset
-            else:
-                # In windowed mode, cover the entire window
-                target_width = SCREEN_WIDTH
-                target_height = SCREEN_HEIGHT
-                target_x = 0
-                target_y = 0
-            
-            # Scale the image to cover the entire screen/game area
-            lose_image = pygame.transform.scale(lose_image, (target_width, target_height))
-            
-            # Draw the lose image as background
-            self.screen.blit(lose_image, (target_x, target_y))
-            
-            # Add a semi-transparent overlay for better text readability
-            overlay = pygame.Surface((target_width, target_height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 150))  # Semi-transparent black (more transparent than before)
-            self.screen.blit(overlay, (target_x, target_y))
-            
-        except Exception as e:
-            print(f"Error loading lose image: {e}")
-            # Fallback to original semi-transparent overlay if image fails to load
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))  # Black with alpha
-            self.screen.blit(overlay, (0, 0))
-    else:
-        # Fallback to original semi-transparent overlay if image doesn't exist
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))  # Black with alpha
+    # Display lose image as background
+    if not self.draw_menu_background("lose", 150):  # Semi-transparent black (more transparent than before)
+        # Fallback to original semi-transparent overlay if the image is missing or broken
+        overlay = self.assets.get_overlay(SCREEN_WIDTH, SCREEN_HEIGHT, 200)  # Black with alpha
         self.screen.blit(overlay, (0, 0))
     
     # Score text - positioned higher now that we removed the GAME OVER text
@@ -769,61 +720,14 @@ def draw_win_screen(self):
         # In windowed mode, just fill the screen
         self.screen.fill((0, 0, 0))
     
-    # Load and display win image as background
-    win_path = os.path.join("assets", "win.png")
-    if os.path.exists(win_path):
-        try:
-            win_image = pygame.image.load(win_path).convert_alpha()
-            
-            # Calculate dimensions to cover the entire screen/game area
-            if self.is_fullscreen:
-                # In fullscreen, cover the game area
-                scaled_width = int(self.original_width * self.scale_factor)
-                scaled_height = int(self.original_height * self.scale_factor)
-                target_width = scaled_width
-                target_height = scaled_height
-                target_x = self.x_offset
-                target_y = self.y_offset
-            else:
-                # In windowed mode, cover the entire window
-                target_width = SCREEN_WIDTH
-                target_height = SCREEN_HEIGHT
-                target_x = 0
-                target_y = 0
-            
-            # Scale the image to cover the entire screen/game area
-            win_image = pygame.transform.scale(win_image, (target_width, target_height))
-            
-            # Draw the win image as background
-            self.screen.blit(win_image, (target_x, target_y))
-            
-            # Add a semi-transparent overlay for better text readability
-            overlay = pygame.Surface((target_width, target_height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 100))  # Semi-transparent black
-            self.screen.blit(overlay, (target_x, target_y))
-            
-        except Exception as e:
-            print(f"Error loading win image: {e}")
-            # Fallback to solid color if image fails to load
-            if self.is_fullscreen:
-                # Draw the green background only in the game area
-                scaled_width = int(self.original_width * self.scale_factor)
-                scaled_height = int(self.original_height * self.scale_factor)
-                victory_bg = pygame.Surface((scaled_width, scaled_height))
-                victory_bg.fill((25, 100, 25))  # Dark green
-                self.screen.blit(victory_bg, (self.x_offset, self.y_offset))
-            else:
-                # In windowed mode, just fill the screen
-                self.screen.fill((25, 100, 25))  # Dark green
-    else:
-        # Fallback to solid color if image doesn't exist
+    # Display win image as background
+    if not self.draw_menu_background("win", 100):  # Semi-transparent black
+        # Fallback to solid color if the image is missing or broken
         if self.is_fullscreen:
             # Draw the green background only in the game area
             scaled_width = int(self.original_width * self.scale_factor)
             scaled_height = int(self.original_height * self.scale_factor)
-            victory_bg = pygame.Surface((scaled_width, scaled_height))
-            victory_bg.fill((25, 100, 25))  # Dark green
-            self.screen.blit(victory_bg, (self.x_offset, self.y_offset))
+            self.screen.fill((25, 100, 25), (self.x_offset, self.y_offset, scaled_width, scaled_height))  # Dark green
         else:
             # In windowed mode, just fill the screen
             self.screen.fill((25, 100, 25))  # Dark green
@@ -853,30 +757,36 @@ def draw_win_screen(self):
                            SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100,
                            outline_color=BLACK, outline_width=1)
 
-def draw_kill_notifications(self):
-    """Draw kill notifications on the screen"""
-    # Only show if there are notifications
-    if not hasattr(self, 'kill_notifications') or not self.kill_notifications:
-        return
-    
-    current_time = pygame.time.get_ticks()
-    notifications_to_remove = []
+def draw_effects(self):
+    """Draw floating text and kill notifications"""
+    effects = self.effects
+    current_time = self.game_clock.get_ticks()
+    
+    # Floating text drifts up a little over its lifetime
+    for slot in effects.active(FLOATING_TEXT, current_time):
+        lifespan = effects.end_time[slot] - effects.start_time[slot]
+        progress = (current_time - effects.start_time[slot]) / lifespan if lifespan else 1.0
+        self.drawn_rects.append(self.draw_outlined_text(
+            effects.text[slot],
+            self.bot_nickname_font,
+            effects.color[slot],
+            effects.x[slot],
+            effects.y[slot] - 10 * progress,
+            outline_color=BLACK,
+            outline_width=1,
+            layer=LAYER_LABELS
+        ))
     
     # Draw each notification
     y_offset = 80  # Start below the wave counter
     
-    for i, notification in enumerate(self.kill_notifications):
-        # Check if the notification has expired
-        if current_time - notification['time'] > 3000:  # 3 seconds
-            notifications_to_remove.append(i)
-            continue
+    for slot in effects.active(KILL_NOTICE, current_time):
+        name = effects.text[slot]
         
         # Use grave sprite instead of emoji if available
         if hasattr(self, 'sprite_manager') and 'grave' in self.sprite_manager.sprites:
             # Get text dimensions to properly align grave icon with text
-            text_surface = self.info_font.render(notification['name'], True, (255, 255, 255))
-            text_width = text_surface.get_width()
-            text_height = text_surface.get_height()
+            text_width, text_height = self.info_font.size(name)
             
             # Position text aligned to right edge with margin
             text_x = SCREEN_WIDTH - 20
@@ -885,17 +795,18 @@ def draw_kill_notifications(self):
             grave_size = (int(text_height * 0.9), int(text_height * 0.9))
             
             # Draw the text right-aligned with outline
-            self.draw_outlined_text(
-                notification['name'], 
+            self.drawn_rects.append(self.draw_outlined_text(
+                name, 
                 self.info_font, 
-                (255, 255, 255), 
+                effects.color[slot], 
                 text_x, 
                 y_offset, 
                 outline_color=BLACK,
                 outline_width=1,
                 centered=False, 
-                align="right"
-            )
+                align="right",
+                layer=LAYER_LABELS
+            ))
             
             # Place grave icon before the text with proper spacing
             grave_x = text_x - text_width - grave_size[0] - 5  # Position icon before text with reduced spacing
@@ -914,72 +825,76 @@ def draw_kill_notifications(self):
             )
             
             # Draw the grave sprite
-            self.screen.blit(grave_sprite, grave_pos)
+            self.drawn_rects.append(self.render_queue.add(LAYER_LABELS, grave_sprite, grave_pos))
         else:
             # Fallback to emoji if sprite manager not available
             # Position text aligned to right edge with margin
             text_x = SCREEN_WIDTH - 20
             
             # Draw right-aligned text with emoji and outline
-            kill_text = f"💀 {notification['name']}"
-            self.draw_outlined_text(
+            kill_text = f"💀 {name}"
+            self.drawn_rects.append(self.draw_outlined_text(
                 kill_text, 
                 self.info_font, 
-                (255, 255, 255), 
+                effects.color[slot], 
                 text_x, 
                 y_offset, 
                 outline_color=BLACK,
                 outline_width=1,
                 centered=False, 
-                align="right"
-            )
+                align="right",
+                layer=LAYER_LABELS
+            ))
         
         # Increase y_offset for next notification
         y_offset += 25
-    
-    # Remove expired notifications
-    for i in sorted(notifications_to_remove, reverse=True):
-        self.kill_notifications.pop(i)
 
 def draw_enemies(self):
     """Draw enemies and their health bars"""
-    for enemy in self.enemies:
-        # Scale enemy position for rendering
-        enemy_rect = self.scale_position(
-            pygame.Rect(enemy["x"], enemy["y"], enemy["width"], enemy["height"])
-        )
-        
-        # Check if it's a boss
-        is_boss = enemy.get("is_boss", False)
-        
-        # Draw enemy with sprite if available
-        enemy_sprite_drawn = False
-        if hasattr(self, 'sprite_manager'):
+    queue = self.render_queue
+    
+    # Scale enemy positions for rendering
+    enemy_rects = [
+        self.scale_position(pygame.Rect(enemy.x, enemy.y, enemy.width, enemy.height))
+        for enemy in self.enemies
+    ]
+    
+    # Queue every enemy's sprite first and draw them together, so the bars
+    # and lines drawn below end up on top
+    enemy_sprites_drawn = hasattr(self, 'sprite_manager')
+    if enemy_sprites_drawn:
+        for enemy, enemy_rect in zip(self.enemies, enemy_rects):
             # If the enemy is defeated, use the grave sprite
-            if enemy["health"] <= 0:
-                grave_sprite = self.sprite_manager.get_scaled_grave_sprite(
+            if enemy.health <= 0:
+                enemy_sprite = self.sprite_manager.get_scaled_grave_sprite(
                     enemy_rect.width, enemy_rect.height
                 )
-                self.screen.blit(grave_sprite, enemy_rect)
-                enemy_sprite_drawn = True
             else:
                 # Use regular enemy sprite (randomly selected if not specified)
-                if "portrait_index" not in enemy:
+                if enemy.portrait_index is None:
                     # Assign a random portrait index if not yet assigned
-                    enemy["portrait_index"] = random.randint(0, 4)
+                    enemy.portrait_index = random.randint(0, 4)
                     
-                enemy_sprite = self.sprite_manager.get_enemy_portrait(enemy["portrait_index"])
-                enemy_sprite = pygame.transform.scale(enemy_sprite, (enemy_rect.width, enemy_rect.height))
-                self.screen.blit(enemy_sprite, enemy_rect)
-                enemy_sprite_drawn = True
+                enemy_sprite = self.sprite_manager.get_scaled_enemy_portrait(
+                    enemy.portrait_index, enemy_rect.width, enemy_rect.height
+                )
+            queue.add(LAYER_UNITS, enemy_sprite, enemy_rect.topleft)
+        queue.flush(self.screen, (LAYER_UNITS,))
+    
+    for enemy, enemy_rect in zip(self.enemies, enemy_rects):
+        # Check if it's a boss
+        is_boss = enemy.is_boss
+        
+        # Everything drawn for this enemy is added to this area
+        enemy_area = enemy_rect.copy()
         
         # If no sprite available, fallback to colored shapes
-        if not enemy_sprite_drawn:
+        if not enemy_sprites_drawn:
             # For dead enemies, make them semi-transparent
-            if enemy["health"] <= 0:
+            if enemy.health <= 0:
                 alpha = 100  # Semi-transparent
                 # Create a transparent version of the color
-                color = (*enemy["color"], alpha)
+                color = (*enemy.color, alpha)
                 
                 # Create a transparent surface and draw the enemy
                 s = pygame.Surface((enemy_rect.width, enemy_rect.height), pygame.SRCALPHA)
@@ -989,13 +904,13 @@ def draw_enemies(self):
                 self.screen.blit(s, enemy_rect)
             else:
                 # Draw normal enemy
-                pygame.draw.rect(self.screen, enemy["color"], enemy_rect)
+                pygame.draw.rect(self.screen, enemy.color, enemy_rect)
                 pygame.draw.rect(self.screen, (255, 255, 255), enemy_rect, 2)  # White border
             
             # If boss, draw a crown or indicator above it
             if is_boss:
-                alpha = 100 if enemy["health"] <= 0 else 255
-                crown_color = (255, 215, 0, alpha) if enemy["health"] <= 0 else (255, 215, 0)
+                alpha = 100 if enemy.health <= 0 else 255
+                crown_color = (255, 215, 0, alpha) if enemy.health <= 0 else (255, 215, 0)
                 crown_points = [
                     (enemy_rect.centerx, enemy_rect.top - 10),
                     (enemy_rect.centerx - 10, enemy_rect.top - 5),
@@ -1004,15 +919,15 @@ def draw_enemies(self):
                     (enemy_rect.centerx + 5, enemy_rect.top - 15),
                     (enemy_rect.centerx + 10, enemy_rect.top - 5)
                 ]
-                pygame.draw.polygon(self.screen, crown_color, crown_points)
+                enemy_area.union_ip(pygame.draw.polygon(self.screen, crown_color, crown_points))
         
         # If in debug mode, show collision boxes for bosses
         if is_boss and hasattr(self, 'debug_mode') and self.debug_mode:
             # Get collision dimensions and position
-            col_x = enemy["x"] + enemy.get("collision_offset_x", 0)
-            col_y = enemy["y"] + enemy.get("collision_offset_y", 0)
-            col_width = enemy.get("collision_width", enemy["width"])
-            col_height = enemy.get("collision_height", enemy["height"])
+            col_x = enemy.x + enemy.collision_offset_x
+            col_y = enemy.y + enemy.collision_offset_y
+            col_width = enemy.collision_width or enemy.width
+            col_height = enemy.collision_height or enemy.height
             
             # Scale for rendering
             col_rect = self.scale_position(
@@ -1022,24 +937,12 @@ def draw_enemies(self):
             # Draw the collision box with transparency
             s = pygame.Surface((col_rect.width, col_rect.height), pygame.SRCALPHA)
             pygame.draw.rect(s, (255, 255, 0, 100), (0, 0, col_rect.width, col_rect.height))
-            self.screen.blit(s, col_rect)
+            enemy_area.union_ip(self.screen.blit(s, col_rect))
         
         # Draw health bar above enemy
         health_bar_width = enemy_rect.width
         health_bar_height = 5
-        health_percentage = enemy["health"] / enemy["max_health"]
-        
-        # Background of health bar (gray)
-        pygame.draw.rect(
-            self.screen,
-            (100, 100, 100),
-            (
-                enemy_rect.x,
-                enemy_rect.y - health_bar_height - 2,
-                health_bar_width,
-                health_bar_height
-            )
-        )
+        health_percentage = enemy.health / enemy.max_health
         
         # Foreground of health bar (colored based on health)
         if health_percentage > 0.7:
@@ -1048,28 +951,25 @@ def draw_enemies(self):
             health_color = (255, 255, 0)  # Yellow
         else:
             health_color = (255, 0, 0)  # Red
-            
-        pygame.draw.rect(
-            self.screen,
-            health_color,
-            (
-                enemy_rect.x,
-                enemy_rect.y - health_bar_height - 2,
-                health_bar_width * health_percentage,
-                health_bar_height
-            )
+        
+        # On a gray background, as one ready-made bar
+        strip, area = self.widgets.bar(
+            health_bar_width, health_bar_height, health_percentage, health_color, (100, 100, 100)
         )
+        enemy_area.union_ip(queue.add(
+            LAYER_BARS, strip, (enemy_rect.x, enemy_rect.y - health_bar_height - 2), area
+        ))
         
         # Draw enemy name above health bar with outline
-        if "name" in enemy:
+        if enemy.name:
             # Set the font based on whether it's a boss
             if hasattr(self, 'bot_nickname_font'):
                 name_font = self.bot_nickname_font  # Regular enemies
             elif hasattr(self, 'info_font'):
                 name_font = self.info_font  # Fallback
             else:
-                # Create font if necessary
-                name_font = pygame.font.SysFont("Arial", 16)
+                # Fetch font if necessary
+                name_font = self.fonts.get("Arial", 16)
             
             # Use larger font for bosses if available
             if is_boss:
@@ -1078,82 +978,78 @@ def draw_enemies(self):
                 elif hasattr(self, 'menu_font'):
                     name_font = self.menu_font  # Alternative
                 else:
-                    # Create font if necessary
-                    name_font = pygame.font.SysFont("Arial", 24)
+                    # Fetch font if necessary
+                    name_font = self.fonts.get("Arial", 24)
             
             # Draw name with outline for better contrast
             # For defeated enemies, position the name higher
             name_y_position = enemy_rect.y - health_bar_height - 15  # Default position
             
             # If enemy is defeated, move the name higher
-            if enemy["health"] <= 0:
+            if enemy.health <= 0:
                 name_y_position = enemy_rect.y - 30  # Higher position for defeated enemies
             
             # Check if enemy is a boss
-            is_boss = "is_boss" in enemy and enemy["is_boss"]
-            icon_width = 0
+            is_boss = enemy.is_boss
+            icon = None
             
             if is_boss:
-                # Get boss type from name
-                icon_type = "Boss"  # Default
-                if "boss_prefix" in enemy:
-                    icon_type = enemy["boss_prefix"]
-                
-                # Try to get the icon from sprite manager
-                icon = self.sprite_manager.get_boss_icon(icon_type)
-                
-                # Calculate icon position (left of the name)
-                icon_size = 24
-                
-                # Measure text width to properly position the icon
-                text_width = name_font.size(enemy["name"])[0]
-                
-                # Create more distance between icon and text (position icon far to the left)
-                icon_x = enemy_rect.centerx - text_width//2 - icon_size - 5  # Reduced spacing
-                icon_y = name_y_position - icon_size//2
-                
                 # Check if this boss already has a cached icon
-                if "cached_icon" not in enemy:
-                    # Cache the icon for this boss
-                    enemy["cached_icon"] = pygame.transform.scale(icon, (icon_size, icon_size))
-                
-                # Draw the cached icon
-                self.screen.blit(enemy["cached_icon"], (icon_x, icon_y))
-                
-                # Keep text centered on the enemy (don't adjust for icon)
-                text_x = enemy_rect.centerx
-                icon_width = 0  # Don't shift the text
-            else:
-                text_x = enemy_rect.centerx
+                if enemy.cached_icon is None:
+                    # Get the icon for the boss's title from the sprite manager and cache it for this boss
+                    icon = self.sprite_manager.get_boss_icon(enemy.boss_prefix)
+                    enemy.cached_icon = pygame.transform.scale(icon, (ICON_SIZE, ICON_SIZE))
+                icon = enemy.cached_icon
             
-            # Draw name with outline and adjusted position for icon
-            self.draw_outlined_text(
-                enemy["name"],
-                name_font,
-                (255, 255, 255),  # White text
-                text_x,  # Use the calculated text position
-                name_y_position,
-                outline_color=(0, 0, 0),  # Black outline
-                outline_width=1
+            # Name with outline and the icon left of it, made once and reused
+            text_scale = self.scale_factor if self.is_fullscreen and self.scale_factor > 1.5 else None
+            nameplate, offset = self.widgets.nameplate(
+                enemy.name, name_font, icon, text_scale, self.get_scaled_font(name_font, text_scale)
             )
+            enemy_area.union_ip(queue.add(
+                LAYER_LABELS, nameplate,
+                (enemy_rect.centerx + offset[0], name_y_position + offset[1])
+            ))
             
         # Draw direction indicator (aim line) for living enemies
-        if "direction" in enemy and enemy["health"] > 0:
-            angle_rad = math.radians(enemy["direction"])
-            start_x = enemy["x"] + enemy["width"] / 2
-            start_y = enemy["y"] + enemy["height"] / 2
+        if enemy.health > 0:
+            angle_rad = math.radians(enemy.direction)
+            start_x = enemy.x + enemy.width / 2
+            start_y = enemy.y + enemy.height / 2
             end_x = start_x + math.cos(angle_rad) * 20
             end_y = start_y + math.sin(angle_rad) * 20
             
-            pygame.draw.line(
+            enemy_area.union_ip(pygame.draw.line(
                 self.screen,
                 (255, 0, 0),  # Red line for enemies
                 self.scale_position(start_x, start_y),
                 self.scale_position(end_x, end_y),
                 2
-            )
+            ))
+        
+        self.drawn_rects.append(enemy_area)
+
+def text_rect_at(text_size, x, y, centered=True, align="center"):
+    """Rectangle of a piece of text placed at x, y in original game space"""
+    text_rect = pygame.Rect((0, 0), text_size)
+    if centered:
+        text_rect.center = (x, y)
+    else:
+        if align == "left":
+            text_rect.topleft = (x, y)
+        elif align == "right":
+            text_rect.topright = (x, y)
+        else:
+            text_rect.center = (x, y)
+    return text_rect
+
+def get_scaled_font(self, font, scale):
+    """The registry's version of font at scale times the size, or None (no scale or unknown font)"""
+    if scale is None or not hasattr(self, 'fonts'):
+        return None
+    return self.fonts.scaled(font, scale)
 
-def draw_text(self, text, font, color, x, y, centered=True, align="center"):
+def draw_text(self, text, font, color, x, y, centered=True, align="center", layer=None):
     """
     Helper function to draw text with proper scaling and positioning
     
@@ -1164,39 +1060,28 @@ def draw_text(self, text, font, color, x, y, centered=True, align="center"):
         x, y: Position coordinates in original game space
         centered: Whether text should be centered at x,y (default: True)
         align: Alignment of the text (left, center, right)
+        layer: Render queue layer to add the text to instead of drawing it now
+    
+    Returns:
+        The screen area that was (or will be) drawn on (pygame.Rect)
     """
-    text_surface = font.render(text, True, color)
+    # For improved text rendering at larger scales, the text is drawn with a bigger font
+    text_scale = self.scale_factor if self.is_fullscreen and self.scale_factor > 1.5 else None
+    text_surface, text_size = self.text_cache.get(
+        text, font, color, scale=text_scale, scaled_font=self.get_scaled_font(font, text_scale)
+    )
     
-    if centered:
-        text_rect = text_surface.get_rect(center=(x, y))
-    else:
-        if align == "left":
-            text_rect = text_surface.get_rect(topleft=(x, y))
-        elif align == "right":
-            text_rect = text_surface.get_rect(topright=(x, y))
-        else:
-            text_rect = text_surface.get_rect(center=(x, y))
+    text_rect = text_rect_at(text_size, x, y, centered, align)
     
     # Apply scaling
     scaled_x = text_rect.x * self.scale_factor + self.x_offset
     scaled_y = text_rect.y * self.scale_factor + self.y_offset
     
-    # Position the text
-    scaled_pos = (scaled_x, scaled_y)
-    
-    # For improved text rendering at larger scales, check if we need to scale the text
-    if self.is_fullscreen and self.scale_factor > 1.5:
-        # Scale the text itself for better clarity
-        orig_width, orig_height = text_surface.get_size()
-        scaled_text = pygame.transform.smoothscale(
-            text_surface, 
-            (int(orig_width * self.scale_factor), int(orig_height * self.scale_factor))
-        )
-        self.screen.blit(scaled_text, scaled_pos)
-    else:
-        self.screen.blit(text_surface, scaled_pos)
+    if layer is not None:
+        return self.render_queue.add(layer, text_surface, (scaled_x, scaled_y))
+    return self.screen.blit(text_surface, (scaled_x, scaled_y))
 
-def draw_outlined_text(self, text, font, color, x, y, outline_color=(0, 0, 0), outline_width=1, centered=True, align="center"):
+def draw_outlined_text(self, text, font, color, x, y, outline_color=(0, 0, 0), outline_width=1, centered=True, align="center", layer=None):
     """
     Draw text with an outline for better readability
     
@@ -1209,45 +1094,29 @@ def draw_outlined_text(self, text, font, color, x, y, outline_color=(0, 0, 0), o
         outline_width: Width of the outline in pixels
         centered: Whether text should be centered at x,y
         align: Alignment of the text (left, center, right)
+        layer: Render queue layer to add the text to instead of drawing it now
+    
+    Returns:
+        The screen area that was (or will be) drawn on (pygame.Rect)
     """
-    # Create the main text surface
-    text_surface = font.render(text, True, color)
+    # The cached surface already has the outline drawn around the text
+    text_scale = self.scale_factor if self.is_fullscreen and self.scale_factor > 1.5 else None
+    text_surface, text_size = self.text_cache.get(
+        text, font, color, outline_color, outline_width, text_scale,
+        scaled_font=self.get_scaled_font(font, text_scale)
+    )
     
-    # Create a separate surface for the outline
-    outline_surface = font.render(text, True, outline_color)
-    
-    if centered:
-        text_rect = text_surface.get_rect(center=(x, y))
-    else:
-        if align == "left":
-            text_rect = text_surface.get_rect(topleft=(x, y))
-        elif align == "right":
-            text_rect = text_surface.get_rect(topright=(x, y))
-        else:
-            text_rect = text_surface.get_rect(center=(x, y))
+    text_rect = text_rect_at(text_size, x, y, centered, align)
     
     # Apply scaling
     scaled_x = text_rect.x * self.scale_factor + self.x_offset
     scaled_y = text_rect.y * self.scale_factor + self.y_offset
     
-    # Create scaled versions of the text surfaces if needed
-    if self.is_fullscreen and self.scale_factor > 1.5:
-        orig_width, orig_height = text_surface.get_size()
-        scaled_width = int(orig_width * self.scale_factor)
-        scaled_height = int(orig_height * self.scale_factor)
-        
-        text_surface = pygame.transform.smoothscale(text_surface, (scaled_width, scaled_height))
-        outline_surface = pygame.transform.smoothscale(outline_surface, (scaled_width, scaled_height))
-    
-    # Draw the outline by offsetting the text in all directions
-    for dx in range(-outline_width, outline_width + 1):
-        for dy in range(-outline_width, outline_width + 1):
-            if dx != 0 or dy != 0:  # Skip the center position
-                # Draw outline positions
-                self.screen.blit(outline_surface, (scaled_x + dx, scaled_y + dy))
-    
-    # Draw the actual text on top of the outline
-    self.screen.blit(text_surface, (scaled_x, scaled_y))
+    # The outline sticks out outline_width pixels on every side
+    dest = (scaled_x - outline_width, scaled_y - outline_width)
+    if layer is not None:
+        return self.render_queue.add(layer, text_surface, dest)
+    return self.screen.blit(text_surface, dest)
 
 def scale_position(self, x, y=None, width=None, height=None):
     """
@@ -1255,7 +1124,8 @@ def scale_position(self, x, y=None, width=None, height=None):
     If y is None, x is assumed to be a tuple or list (x, y) or a pygame.Rect.
     Returns scaled coordinates as tuple, or Rect if width/height are provided.
     """
-    if not self.is_fullscreen:
+    # Nothing to scale when fullscreen draws on the logical surface either
+    if not self.is_fullscreen or self.screen is not self.display:
         if y is None:
             if hasattr(x, 'x'):  # It's a Rect
                 if width is None and height is None:
@@ -1297,21 +1167,25 @@ def patch_pybrawl_class():
     from game_engine import PyBrawl
     
     PyBrawl.draw_title_screen = draw_title_screen
+    PyBrawl.draw_menu_background = draw_menu_background
     PyBrawl.draw_character_select = draw_character_select
     PyBrawl.draw_gameplay = draw_gameplay
     PyBrawl.draw_game_over = draw_game_over
     PyBrawl.draw_outlined_text = draw_outlined_text
     PyBrawl.draw_map = draw_map  # Add the new map drawing function
+    PyBrawl.build_map_layer = build_map_layer
+    PyBrawl.restore_map_areas = restore_map_areas
     PyBrawl.scale_position = scale_position
     PyBrawl.draw_text = draw_text  # Add the draw_text function
+    PyBrawl.get_scaled_font = get_scaled_font
     PyBrawl.draw_enemies = draw_enemies  # Add the new enemy drawing function
     
     # Make sure to add optional functions only if they exist
     if 'draw_win_screen' in globals():
         PyBrawl.draw_win_screen = draw_win_screen
     
-    if 'draw_kill_notifications' in globals():
-        PyBrawl.draw_kill_notifications = draw_kill_notifications
+    if 'draw_effects' in globals():
+        PyBrawl.draw_effects = draw_effects
         
     if 'draw_hud' in globals():
         PyBrawl.draw_hud = draw_hud
@@ -0,0 +1,54 @@
+# Uniform-grid spatial hash.
+# Rectangles are dropped into every grid cell they overlap, so "what could be
+# touching this area?" only has to look at a few nearby cells instead of
+# every object in the game.
+
+class SpatialHash:
+    """Buckets items by the grid cells their rectangles overlap"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> list of items
+
+    def clear(self):
+        """Forget all items (call once per frame before inserting again)"""
+        self.cells.clear()
+
+    def insert(self, item, x, y, width, height):
+        """Add an item covering the rectangle (x, y, width, height)"""
+        cell_size = self.cell_size
+        cells = self.cells
+        for cell_x in range(int(x // cell_size), int((x + width) // cell_size) + 1):
+            for cell_y in range(int(y // cell_size), int((y + height) // cell_size) + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is None:
+                    cells[(cell_x, cell_y)] = [item]
+                else:
+                    bucket.append(item)
+
+    def query(self, x, y, width, height):
+        """
+        Items whose cells overlap the rectangle, each listed once.
+
+        These are only candidates - callers still do the exact overlap test.
+        """
+        cell_size = self.cell_size
+        cells = self.cells
+        first_x = int(x // cell_size)
+        last_x = int((x + width) // cell_size)
+        first_y = int(y // cell_size)
+        last_y = int((y + height) // cell_size)
+
+        # Most queries touch a single cell - no need to remove duplicates then
+        if first_x == last_x and first_y == last_y:
+            return cells.get((first_x, first_y), ())
+
+        found = []
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    for item in bucket:
+                        if item not in found:
+                            found.append(item)
+        return found
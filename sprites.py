@@ -2,6 +2,11 @@ import pygame
 import os
 import random
 import io
+from collections import OrderedDict
+from surfaces import finalize_surface
+
+# How many scaled sprites to keep around (least recently used are dropped)
+SCALED_CACHE_SIZE = 128
 
 class SpriteManager:
     """Sprite manager for loading and handling game sprites"""
@@ -24,6 +29,20 @@ class SpriteManager:
         # Initialize boss icons
         self.boss_icons = {}
         self.create_boss_icons()
+        
+        # Scaled copies of sprites, keyed by (name, width, height, smooth),
+        # most recently used last
+        self.scaled_cache = OrderedDict()
+        self.scaled_cache_size = SCALED_CACHE_SIZE
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.scale_factor = 1.0  # Display scale the cached sizes were made for
+        
+        # Bullet circles drawn once per (color, radius)
+        self.bullet_sprites = {}
+        
+        # Convert everything for the display it will be drawn on
+        self.finalize_sprites()
     
     def load_sprites_from_grid(self, path):
         """Load sprites from a regular grid-based sprite sheet"""
@@ -135,7 +154,64 @@ class SpriteManager:
         else:
             return self.enemy_portraits[index]
     
-    def get_scaled_sprite(self, sprite_name, width, height):
+    def get_cached_scale(self, key, source, width, height, smooth=False):
+        """Return source scaled to (width, height), reusing an earlier copy with the same key"""
+        cache = self.scaled_cache
+        scaled = cache.get(key)
+        if scaled is not None:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return scaled
+        
+        self.cache_misses += 1
+        if smooth:
+            if source.get_colorkey() is not None:
+                source = source.convert_alpha()  # Don't blend the key color into the edges
+            scaled = finalize_surface(pygame.transform.smoothscale(source, (width, height)))
+        else:
+            # Same format (and color key) as the already finalized source
+            scaled = pygame.transform.scale(source, (width, height))
+        
+        cache[key] = scaled
+        if len(cache) > self.scaled_cache_size:
+            cache.popitem(last=False)  # Drop the least recently used copy
+        return scaled
+    
+    def clear_scaled_cache(self):
+        """Forget every scaled copy"""
+        self.scaled_cache.clear()
+    
+    def finalize_sprites(self):
+        """Convert every sprite and icon to the display's format (again after a display mode change)"""
+        finalized = {}  # id(old surface) -> new one, so shared sprites stay shared
+        
+        def finalize(surface):
+            if id(surface) not in finalized:
+                finalized[id(surface)] = finalize_surface(surface)
+            return finalized[id(surface)]
+        
+        for name, sprite in self.sprites.items():
+            self.sprites[name] = finalize(sprite)
+        
+        # Portraits are usually the enemy_bot sprites, so this picks up the same copies
+        self.enemy_portraits = [finalize(portrait) for portrait in self.enemy_portraits]
+        
+        for prefix, icons in self.boss_icons.items():
+            self.boss_icons[prefix] = [finalize(icon) for icon in icons]
+        
+        for key, sprite in self.bullet_sprites.items():
+            self.bullet_sprites[key] = finalize(sprite)
+        
+        # Scaled copies were made from the old surfaces
+        self.clear_scaled_cache()
+    
+    def set_scale_factor(self, scale_factor):
+        """Tell the manager the display scale changed - old sizes won't be asked for again"""
+        if scale_factor != self.scale_factor:
+            self.scale_factor = scale_factor
+            self.clear_scaled_cache()
+    
+    def get_scaled_sprite(self, sprite_name, width, height, smooth=False):
         """Get a scaled version of a sprite"""
         if sprite_name not in self.sprites:
             print(f"Warning: Sprite '{sprite_name}' not found in available sprites: {list(self.sprites.keys())}")
@@ -144,7 +220,15 @@ class SpriteManager:
             return pygame.transform.scale(default, (width, height))
         
         # Return a scaled version of the sprite
-        return pygame.transform.scale(self.sprites[sprite_name], (width, height))
+        key = (sprite_name, width, height, smooth)
+        return self.get_cached_scale(key, self.sprites[sprite_name], width, height, smooth)
+    
+    def get_scaled_enemy_portrait(self, index, width, height):
+        """Get an enemy portrait (see get_enemy_portrait) scaled to the given size"""
+        portrait = self.get_enemy_portrait(index)
+        # Portraits can be picked at random, so key by the portrait actually chosen
+        key = ("enemy_portrait", id(portrait), width, height, False)
+        return self.get_cached_scale(key, portrait, width, height)
 
     def get_scaled_grave_sprite(self, width, height):
         """Get a scaled version of the grave sprite"""
@@ -158,6 +242,23 @@ class SpriteManager:
             print(f"Warning: Unknown tile type '{tile_type}'")
             return self.get_scaled_sprite('ground', width, height)  # Default to ground
 
+    def get_bullet_sprite(self, color, radius):
+        """A filled circle for bullets - blit it at (center x - radius, center y - radius)"""
+        key = (color, radius)
+        sprite = self.bullet_sprites.get(key)
+        if sprite is None:
+            # Same pixels as pygame.draw.circle at that center, with the
+            # corners made see-through by a color key that isn't the bullet's
+            size = max(1, radius * 2)
+            background = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+            sprite = pygame.Surface((size, size))
+            sprite.fill(background)
+            sprite.set_colorkey(background)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            sprite = finalize_surface(sprite)
+            self.bullet_sprites[key] = sprite
+        return sprite
+    
     def create_boss_icons(self):
         """Create boss icons using Pygame drawing primitives"""
         size = 24
@@ -0,0 +1,48 @@
+# Getting surfaces ready for fast drawing.
+# A surface drawn every frame should be in the display's pixel format,
+# otherwise every blit converts it pixel by pixel. How it is converted depends
+# on its transparency:
+# - no see-through pixels: plain convert(), the fastest to blit
+# - every pixel either fully see-through or fully solid: a color key with
+#   RLE acceleration, which skips the see-through runs when blitting
+# - anything else (soft edges, antialiased text): convert_alpha()
+import pygame
+
+# Color for see-through pixels of color keyed surfaces (hardly used in art)
+COLORKEY = (255, 0, 255)
+
+def finalize_surface(surface):
+    """
+    A copy of surface in the display's format, picked by its transparency.
+
+    Without a display (headless runs) the surface is returned as it is.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+
+    if not surface.get_flags() & pygame.SRCALPHA:
+        # No alpha channel - keep a color key if it has one
+        colorkey = surface.get_colorkey()
+        surface = surface.convert()
+        if colorkey is not None:
+            surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        return surface
+
+    pixel_count = surface.get_width() * surface.get_height()
+    solid_count = pygame.mask.from_surface(surface, 254).count()  # Alpha 255
+    if solid_count == pixel_count:
+        return surface.convert()
+
+    visible_count = pygame.mask.from_surface(surface, 0).count()  # Alpha above 0
+    if solid_count == visible_count:
+        # Only on/off transparency: paint the see-through pixels in the key color
+        keyed = pygame.Surface(surface.get_size()).convert()
+        keyed.fill(COLORKEY)
+        keyed.blit(surface, (0, 0))
+        keyed.set_colorkey(COLORKEY, pygame.RLEACCEL)
+
+        # Unless some solid pixel happens to be the key color itself
+        if pygame.mask.from_surface(keyed).count() == solid_count:
+            return keyed
+
+    return surface.convert_alpha()
@@ -0,0 +1,75 @@
+# Cache of rendered text.
+# Most text on screen (names, HUD, wave counter) is the same from one frame to
+# the next, so each rendered string is kept and reused instead of calling
+# font.render again. Outlined text is stored with its outline already drawn
+# around it, so drawing it is a single blit.
+import pygame
+from collections import OrderedDict
+from surfaces import finalize_surface
+
+# How many rendered strings to keep (least recently used are dropped)
+TEXT_CACHE_SIZE = 256
+
+class TextCache:
+    """Rendered text surfaces, reused until they go unused for a while"""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (surface, unscaled text size)
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Forget all rendered text"""
+        self.entries.clear()
+
+    def get(self, text, font, color, outline_color=None, outline_width=0, scale=None, scaled_font=None):
+        """
+        Rendered text and the size of the text at scale 1.
+
+        With an outline_color the surface is outline_width pixels larger on
+        every side than the text, so blit it that much up and left. A scale
+        draws the text bigger (the outline width stays in screen pixels):
+        with scaled_font, the same font at the bigger size, it is rendered
+        sharp, otherwise it is smoothly resized.
+        """
+        key = (text, font, color, outline_color, outline_width, scale)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        text_size = font.size(text)
+
+        def render(render_color):
+            if scale is None:
+                return font.render(text, True, render_color)
+            if scaled_font is not None:
+                return scaled_font.render(text, True, render_color)
+            scaled_size = (int(text_size[0] * scale), int(text_size[1] * scale))
+            return pygame.transform.smoothscale(font.render(text, True, render_color), scaled_size)
+
+        text_surface = render(color)
+        if outline_color is None:
+            surface = text_surface
+        else:
+            outline_surface = render(outline_color)
+
+            # Draw the outline by offsetting the text in all directions, then the text on top
+            width, height = text_surface.get_size()
+            surface = pygame.Surface(
+                (width + 2 * outline_width, height + 2 * outline_width), pygame.SRCALPHA
+            )
+            for dx in range(-outline_width, outline_width + 1):
+                for dy in range(-outline_width, outline_width + 1):
+                    if dx != 0 or dy != 0:  # Skip the center position
+                        surface.blit(outline_surface, (outline_width + dx, outline_width + dy))
+            surface.blit(text_surface, (outline_width, outline_width))
+
+        entry = (finalize_surface(surface), text_size)
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)  # Drop the least recently used text
+        return entry
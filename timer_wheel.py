@@ -0,0 +1,112 @@
+# Hierarchical timer wheel.
+# Timed events (the next shot of a burst, an effect running out) are filed
+# under the millisecond they are due instead of being polled every frame.
+# Level 0 has one slot per millisecond for the next 64 ms, level 1 one slot per
+# 64 ms, and so on; a timer starts on the coarsest level it needs and drops to
+# finer levels as its time comes closer. Advancing the wheel only looks at
+# the slots it passes, so timers that aren't due cost nothing.
+
+# Slots per level (a power of two) and number of levels
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4  # Covers 64**4 ms (about 4.6 hours) - later timers wait in a list
+
+class Timer:
+    """A callback scheduled on a TimerWheel"""
+
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline  # Milliseconds
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the callback from running (harmless if it already ran)"""
+        self.cancelled = True
+
+class TimerWheel:
+    """Runs callbacks at the millisecond they were scheduled for"""
+
+    def __init__(self):
+        self.time = 0  # First millisecond whose timers haven't run yet
+        self.levels = [[[] for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self.far = []  # Timers beyond the top level
+        self.counts = [0] * LEVELS  # Timers filed on each level
+        self.pending = 0  # Timers filed and not yet run or dropped
+
+    def schedule(self, deadline, callback, *args):
+        """Run callback(*args) once the wheel reaches deadline; returns the Timer"""
+        timer = Timer(deadline, callback, args)
+        self.insert(timer)
+        self.pending += 1
+        return timer
+
+    def insert(self, timer):
+        """File a timer under the slot for its deadline"""
+        # Timers that are already due run on the next millisecond processed
+        time = self.time
+        deadline = max(timer.deadline, time)
+        for level in range(LEVELS):
+            shift = SLOT_BITS * (level + 1)
+            # The finest level whose current lap the deadline falls in
+            if deadline >> shift == time >> shift:
+                slot = (deadline >> (SLOT_BITS * level)) & SLOT_MASK
+                self.levels[level][slot].append(timer)
+                self.counts[level] += 1
+                return
+        self.far.append(timer)
+
+    def advance(self, time):
+        """Run every timer due at or before time, in the order they are due"""
+        while self.time <= time:
+            if self.pending == 0:
+                # Nothing filed - no slots to visit
+                self.time = time + 1
+                return
+            now = self.time
+
+            # With nothing on the finest levels, skip straight to the next
+            # millisecond where a coarser slot begins
+            if not self.counts[0]:
+                level = 1
+                while level < LEVELS and not self.counts[level]:
+                    level += 1
+                lap = 1 << (SLOT_BITS * level)
+                now = (now + lap - 1) & -lap
+                if now > time:
+                    self.time = time + 1
+                    return
+
+                self.time = now
+
+            # Starting a new lap of a level: move the timers of the coarser
+            # slot now beginning down to finer levels (top level first)
+            if now & ((1 << (SLOT_BITS * LEVELS)) - 1) == 0:
+                far, self.far = self.far, []
+                for timer in far:
+                    self.insert(timer)
+            for level in range(LEVELS - 1, 0, -1):
+                if now & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    slot = (now >> (SLOT_BITS * level)) & SLOT_MASK
+                    timers = self.levels[level][slot]
+                    if timers:
+                        self.levels[level][slot] = []
+                        self.counts[level] -= len(timers)
+                        for timer in timers:
+                            self.insert(timer)
+
+            # Run the timers due this millisecond. Anything they schedule for
+            # now or earlier goes to the next millisecond.
+            self.time = now + 1
+            slot = now & SLOT_MASK
+            timers = self.levels[0][slot]
+            if timers:
+                self.levels[0][slot] = []
+                self.counts[0] -= len(timers)
+                for timer in timers:
+                    self.pending -= 1
+                    if not timer.cancelled:
+                        timer.callback(*timer.args)
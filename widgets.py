@@ -0,0 +1,94 @@
+# Ready-made health bars, ammo bars and nameplates.
+# A bar with a given size and colors is drawn once at every fill level into
+# one tall strip, one row per level, and drawing a bar is a blit of the right
+# row. Enemy nameplates (outlined name plus boss icon) are put together once
+# and reused until the name changes.
+import pygame
+from collections import OrderedDict
+from surfaces import finalize_surface
+
+# Most fill levels a bar strip has (narrower bars get one per pixel)
+BAR_LEVELS = 64
+
+# How many nameplates to keep (least recently used are dropped)
+NAMEPLATE_CACHE_SIZE = 128
+
+# Boss icons are drawn this big, left of the name with a small gap
+ICON_SIZE = 24
+ICON_GAP = 5
+
+class WidgetCache:
+    """Bar strips and nameplates, drawn once and reused"""
+
+    def __init__(self, text_cache):
+        self.text_cache = text_cache
+        self.bar_strips = {}  # (width, height, fill, back, border color, border width) -> strip
+        self.nameplates = OrderedDict()  # (name, font, icon, scale) -> (surface, offset)
+
+    def clear(self):
+        """Forget everything drawn (after a display mode change)"""
+        self.bar_strips.clear()
+        self.nameplates.clear()
+
+    def bar(self, width, height, fraction, fill_color, back_color, border_color=None, border_width=0):
+        """
+        A bar filled to fraction (0-1) as (strip, area): blit area of strip.
+
+        Bars up to BAR_LEVELS pixels wide are exact; wider ones are rounded
+        down to the nearest of BAR_LEVELS steps.
+        """
+        width = int(width)
+        height = int(height)
+        levels = max(1, min(BAR_LEVELS, width))
+        key = (width, height, fill_color, back_color, border_color, border_width)
+        strip = self.bar_strips.get(key)
+        if strip is None:
+            strip = pygame.Surface((width, height * (levels + 1)))
+            for level in range(levels + 1):
+                row = pygame.Rect(0, level * height, width, height)
+                strip.fill(back_color, row)
+                strip.fill(fill_color, (0, row.y, level * width // levels, height))
+                if border_color is not None:
+                    pygame.draw.rect(strip, border_color, row, border_width)
+            strip = finalize_surface(strip)
+            self.bar_strips[key] = strip
+
+        level = int(max(0.0, min(1.0, fraction)) * levels)
+        return strip, pygame.Rect(0, level * height, width, height)
+
+    def nameplate(self, name, font, icon=None, scale=None, scaled_font=None):
+        """
+        An outlined name with an optional icon to its left, as (surface, offset).
+
+        Blit the surface at the point the name is centered on plus offset.
+        scale and scaled_font work as in TextCache.get.
+        """
+        key = (name, font, icon, scale)
+        entry = self.nameplates.get(key)
+        if entry is not None:
+            self.nameplates.move_to_end(key)
+            return entry
+
+        # White text with a one pixel black outline, centered on (0, 0)
+        text_surface, _ = self.text_cache.get(
+            name, font, (255, 255, 255), (0, 0, 0), 1, scale, scaled_font
+        )
+        text_rect = text_surface.get_rect(center=(0, 0))
+        parts = [(text_surface, text_rect)]
+
+        if icon is not None:
+            # Icon left of the text, centered on the same line
+            icon_x = -(font.size(name)[0] // 2) - ICON_SIZE - ICON_GAP
+            parts.append((icon.convert_alpha(), pygame.Rect(icon_x, -ICON_SIZE // 2, *icon.get_size())))
+
+        area = parts[0][1].unionall([rect for _, rect in parts[1:]])
+        surface = pygame.Surface(area.size, pygame.SRCALPHA)
+        for part, rect in parts:
+            # Copy the pixels as they are instead of blending onto the empty surface
+            surface.blit(part, rect.move(-area.x, -area.y), special_flags=pygame.BLEND_RGBA_MAX)
+
+        entry = (finalize_surface(surface), area.topleft)
+        self.nameplates[key] = entry
+        if len(self.nameplates) > NAMEPLATE_CACHE_SIZE:
+            self.nameplates.popitem(last=False)  # Drop the least recently used nameplate
+        return entry